@@ -10,21 +10,184 @@ This script:
 """
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
 import sys
 
+try:
+    # Optional: fuses the temperature-priority/impact arithmetic in one sweep
+    from numba import njit, prange
+except ImportError:
+    njit = prange = None
+
+
+if njit is not None:
+    # Note: no fastmath — the kernel relies on IEEE NaN semantics to detect
+    # cells without temperature data
+    @njit(parallel=True, cache=True)
+    def _temp_metrics_kernel(temp, prio, cool, people, temp_min, temp_range,
+                             out_tp, out_prio, out_cf, out_ti):
+        """temp_priority, adjusted priority, cooling °F and impact in one pass."""
+        for i in prange(temp.shape[0]):
+            t = temp[i]
+            if t == t:  # cell has temperature data
+                tp = (t - temp_min) / temp_range if temp_range > 0.0 else 0.5
+                out_prio[i] = prio[i] * (1.0 + 0.2 * tp)
+            else:
+                tp = 0.5
+                out_prio[i] = prio[i]
+            out_tp[i] = tp
+            cf = cool[i] * 1.8
+            out_cf[i] = cf
+            ti = cf * people[i]
+            out_ti[i] = ti if ti == ti else 0.0
+
+    @njit(cache=True)
+    def _nanminmax(values):
+        """Min and max over the finite values in a single pass (NaN if none)."""
+        lo = np.inf
+        hi = -np.inf
+        seen = False
+        for v in values:
+            if v == v:
+                seen = True
+                if v < lo:
+                    lo = v
+                if v > hi:
+                    hi = v
+        if not seen:
+            return np.nan, np.nan
+        return lo, hi
+else:
+    _temp_metrics_kernel = None
+    _nanminmax = None
+
+
+def _accumulate_hex_partials(state, batch):
+    """
+    Fold one CSV record batch into per-hex partial aggregates.
+
+    state maps hex_id -> [temp_sum, temp_count, reduction_sum,
+    reduction_count, first_tree_count, first_lat, first_lon]; only the batch
+    is resident, so peak memory stays bounded by the CSV block size.
+    Returns the number of rows folded in.
+    """
+    b = batch.to_pandas()
+    codes, uniques = pd.factorize(b['hex_id'].to_numpy(), sort=False)
+    n = len(uniques)
+    temp = b['current_temperature_c'].to_numpy(dtype=np.float64)
+    red = b['current_reduction'].to_numpy(dtype=np.float64)
+    t_valid = ~np.isnan(temp)
+    r_valid = ~np.isnan(red)
+    t_sum = np.bincount(codes[t_valid], weights=temp[t_valid], minlength=n)
+    t_cnt = np.bincount(codes[t_valid], minlength=n)
+    r_sum = np.bincount(codes[r_valid], weights=red[r_valid], minlength=n)
+    r_cnt = np.bincount(codes[r_valid], minlength=n)
+    # factorize assigns codes in order of first appearance, so the first
+    # occurrence of each code gives the 'first' aggregation directly
+    _, first_idx = np.unique(codes, return_index=True)
+    trees = b['current_tree_count'].to_numpy()[first_idx]
+    lats = b['lat'].to_numpy()[first_idx]
+    lons = b['lon'].to_numpy()[first_idx]
+    for k, h in enumerate(uniques):
+        s = state.get(h)
+        if s is None:
+            state[h] = [t_sum[k], t_cnt[k], r_sum[k], r_cnt[k],
+                        trees[k], lats[k], lons[k]]
+        else:
+            s[0] += t_sum[k]
+            s[1] += t_cnt[k]
+            s[2] += r_sum[k]
+            s[3] += r_cnt[k]
+    return len(b)
+
+
+def _translate_with_cudf(untitled_results_path, urban_futures_features_path,
+                         output_path):
+    """
+    GPU-resident variant of the translation using RAPIDS cuDF.
+
+    Mirrors the CPU pipeline (CSV read → groupby → merge → priority/impact
+    arithmetic → parquet write) on the cuDF API; the caller has already
+    verified cudf imports and both input paths exist.
+    """
+    import cudf
+
+    untitled_data = cudf.read_csv(
+        str(untitled_results_path),
+        usecols=['hex_id', 'current_temperature_c', 'current_reduction',
+                 'current_tree_count', 'lat', 'lon']
+    )
+    urban_futures_data = cudf.read_parquet(str(urban_futures_features_path))
+
+    temp_data = untitled_data.groupby('hex_id').agg({
+        'current_temperature_c': 'mean',
+        'current_reduction': 'mean',
+        'current_tree_count': 'first',
+        'lat': 'first',
+        'lon': 'first'
+    }).reset_index().rename(columns={
+        'hex_id': 'h3_cell',
+        'current_temperature_c': 'earth2_temp_c',
+        'current_reduction': 'tree_cooling_c',
+        'current_tree_count': 'earth2_tree_count'
+    })
+
+    merged = urban_futures_data.merge(
+        temp_data[['h3_cell', 'earth2_temp_c', 'tree_cooling_c', 'earth2_tree_count']],
+        on='h3_cell',
+        how='left'
+    )
+
+    # Same priority/impact arithmetic as the CPU path
+    temp_min = merged['earth2_temp_c'].min()
+    temp_range = merged['earth2_temp_c'].max() - temp_min
+    if temp_range and temp_range > 0:
+        merged['temp_priority'] = (
+            (merged['earth2_temp_c'] - temp_min) / temp_range
+        ).fillna(0.5)
+    else:
+        merged['temp_priority'] = 0.5
+
+    has_temp = merged['earth2_temp_c'].notna()
+    merged['priority_final'] = merged['priority_final'].where(
+        ~has_temp,
+        merged['priority_final'] * (1 + 0.2 * merged['temp_priority'])
+    )
+
+    merged['tree_cooling_f'] = merged['tree_cooling_c'] * 1.8
+    if 'population_density' in merged.columns:
+        merged['people_affected'] = merged['population_density'].fillna(0)
+    elif 'tree_density_per_km2' in merged.columns:
+        merged['people_affected'] = merged['tree_density_per_km2'] * 100
+    else:
+        merged['people_affected'] = 0.0
+    merged['temp_impact'] = (
+        merged['tree_cooling_f'] * merged['people_affected']
+    ).fillna(0)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    merged.to_parquet(str(output_path))
+    print(f"   ✅ Saved {len(merged)} records to {output_path} (GPU backend)")
+    return merged.to_pandas()
+
+
 def translate_untitled_to_urban_futures(
     untitled_results_path=None,
     urban_futures_features_path=None,
-    output_path=None
+    output_path=None,
+    backend='cpu'
 ):
     """
     Translate untitled folder results to urban futures format.
-    
+
     Args:
         untitled_results_path: Path to untitled folder results CSV
         urban_futures_features_path: Path to urban futures H3 features parquet
         output_path: Path to save updated features
+        backend: 'cpu' (default) or 'gpu' to run the pipeline on RAPIDS cuDF
     """
     # Set default paths
     base_dir = Path(__file__).parent
@@ -41,7 +204,23 @@ def translate_untitled_to_urban_futures(
     print("=" * 60)
     print("Translating Untitled Folder → Urban Futures")
     print("=" * 60)
-    
+
+    if backend == 'gpu':
+        try:
+            import cudf  # noqa: F401
+        except ImportError:
+            print("   ⚠️  cudf not available, falling back to CPU backend")
+        else:
+            if not untitled_results_path.exists():
+                print(f"   ❌ Error: File not found: {untitled_results_path}")
+                return None
+            if not urban_futures_features_path.exists():
+                print(f"   ❌ Error: File not found: {urban_futures_features_path}")
+                return None
+            return _translate_with_cudf(
+                untitled_results_path, urban_futures_features_path, output_path
+            )
+
     # Load untitled folder results
     print(f"\n1. Loading untitled folder results from: {untitled_results_path}")
     if not untitled_results_path.exists():
@@ -49,8 +228,35 @@ def translate_untitled_to_urban_futures(
         return None
     
     try:
-        untitled_data = pd.read_csv(untitled_results_path)
-        print(f"   ✅ Loaded {len(untitled_data)} records")
+        # Arrow's threaded CSV reader with an explicit schema: no per-call
+        # dtype inference, and only the columns the translation touches
+        convert_opts = pacsv.ConvertOptions(
+            include_columns=[
+                'hex_id', 'current_temperature_c', 'current_reduction',
+                'current_tree_count', 'lat', 'lon'
+            ],
+            column_types={
+                'hex_id': pa.string(),
+                'current_temperature_c': pa.float32(),
+                'current_reduction': pa.float32(),
+                'current_tree_count': pa.int32(),
+                'lat': pa.float64(),
+                'lon': pa.float64(),
+            }
+        )
+        read_opts = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+        # Stream the file block by block, folding each batch into per-hex
+        # partial aggregates so the whole CSV is never resident at once
+        agg_state = {}
+        total_rows = 0
+        with pacsv.open_csv(
+            untitled_results_path,
+            read_options=read_opts,
+            convert_options=convert_opts
+        ) as reader:
+            for batch in reader:
+                total_rows += _accumulate_hex_partials(agg_state, batch)
+        print(f"   ✅ Loaded {total_rows} records")
     except Exception as e:
         print(f"   ❌ Error loading file: {e}")
         return None
@@ -61,9 +267,21 @@ def translate_untitled_to_urban_futures(
         print(f"   ❌ Error: File not found: {urban_futures_features_path}")
         return None
     
+    # Columns the translation actually reads; the rest stay on disk and are
+    # re-attached untouched just before saving
+    compute_cols = [
+        'h3_cell', 'priority_final', 'population_density', 'tree_density_per_km2'
+    ]
+
     try:
-        urban_futures_data = pd.read_parquet(urban_futures_features_path)
-        print(f"   ✅ Loaded {len(urban_futures_data)} H3 cells")
+        features_file = pq.ParquetFile(urban_futures_features_path)
+        available_cols = features_file.schema_arrow.names
+        needed_cols = [c for c in compute_cols if c in available_cols]
+        urban_futures_data = features_file.read(
+            columns=needed_cols, use_threads=True
+        ).to_pandas()
+        print(f"   ✅ Loaded {len(urban_futures_data)} H3 cells "
+              f"({len(needed_cols)} of {len(available_cols)} columns)")
     except Exception as e:
         print(f"   ❌ Error loading file: {e}")
         return None
@@ -71,14 +289,22 @@ def translate_untitled_to_urban_futures(
     # Extract and prepare temperature data
     print(f"\n3. Extracting temperature data from untitled folder results...")
     
-    # Get unique hex_id and aggregate (in case of multiple target_reduction rows)
-    temp_data = untitled_data.groupby('hex_id').agg({
-        'current_temperature_c': 'mean',
-        'current_reduction': 'mean',
-        'current_tree_count': 'first',
-        'lat': 'first',
-        'lon': 'first'
-    }).reset_index()
+    # Finalize the streamed per-hex partial aggregates (means over the
+    # accumulated sums/counts, firsts carried through as-is)
+    partials = np.array(
+        [agg_state[h][:4] for h in agg_state], dtype=np.float64
+    ).reshape(len(agg_state), 4)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_temp = np.where(partials[:, 1] > 0, partials[:, 0] / partials[:, 1], np.nan)
+        mean_red = np.where(partials[:, 3] > 0, partials[:, 2] / partials[:, 3], np.nan)
+    temp_data = pd.DataFrame({
+        'hex_id': list(agg_state),
+        'current_temperature_c': mean_temp,
+        'current_reduction': mean_red,
+        'current_tree_count': np.array([agg_state[h][4] for h in agg_state]),
+        'lat': np.array([agg_state[h][5] for h in agg_state]),
+        'lon': np.array([agg_state[h][6] for h in agg_state]),
+    })
     
     # Rename columns to match urban futures format
     temp_data = temp_data.rename(columns={
@@ -93,14 +319,42 @@ def translate_untitled_to_urban_futures(
     # Merge with urban futures features
     print(f"\n4. Merging temperature data with urban futures features...")
     
-    # Ensure h3_cell is string in both
-    temp_data['h3_cell'] = temp_data['h3_cell'].astype(str)
-    urban_futures_data['h3_cell'] = urban_futures_data['h3_cell'].astype(str)
-    
-    merged = urban_futures_data.merge(
-        temp_data[['h3_cell', 'earth2_temp_c', 'tree_cooling_c', 'earth2_tree_count']],
-        on='h3_cell',
-        how='left'
+    # Ensure h3_cell is string in both (kept for the saved output). The
+    # arrow-backed dtype keeps the values in columnar buffers instead of
+    # materializing one Python object per cell
+    temp_data['h3_cell'] = temp_data['h3_cell'].astype('string[pyarrow]')
+    urban_futures_data['h3_cell'] = urban_futures_data['h3_cell'].astype('string[pyarrow]')
+
+    # H3 indexes are 64-bit values, so parse the hex strings once per side
+    # and merge on uint64 keys: the join then runs on pandas' fixed-width
+    # integer factorizer instead of the object-dtype string path
+    temp_data['h3_key'] = np.fromiter(
+        (int(s, 16) for s in temp_data['h3_cell']),
+        dtype=np.uint64, count=len(temp_data)
+    )
+    urban_futures_data['h3_key'] = np.fromiter(
+        (int(s, 16) for s in urban_futures_data['h3_cell']),
+        dtype=np.uint64, count=len(urban_futures_data)
+    )
+
+    # Run the left join through Arrow's multi-threaded hash join instead of
+    # pandas.merge; a row-order column restores the original row order since
+    # the join itself does not guarantee one
+    left = pa.Table.from_pandas(
+        urban_futures_data.assign(
+            _row=np.arange(len(urban_futures_data), dtype=np.int64)
+        ),
+        preserve_index=False
+    )
+    right = pa.Table.from_pandas(
+        temp_data[['h3_key', 'earth2_temp_c', 'tree_cooling_c', 'earth2_tree_count']],
+        preserve_index=False
+    )
+    merged = (
+        left.join(right, keys='h3_key', join_type='left outer')
+        .sort_by('_row')
+        .drop_columns(['h3_key', '_row'])
+        .to_pandas()
     )
     
     matched_count = merged['earth2_temp_c'].notna().sum()
@@ -108,60 +362,115 @@ def translate_untitled_to_urban_futures(
     
     # Add temperature-based priority adjustment
     print(f"\n5. Computing temperature-based priority adjustments...")
-    
-    # Normalize temperature (higher temp = higher priority)
-    if merged['earth2_temp_c'].notna().any():
-        temp_min = merged['earth2_temp_c'].min()
-        temp_max = merged['earth2_temp_c'].max()
-        temp_range = temp_max - temp_min
-        
-        if temp_range > 0:
-            merged['temp_priority'] = (
-                (merged['earth2_temp_c'] - temp_min) / temp_range
-            ).fillna(0.5)
+
+    # Pull the raw arrays once; everything below operates on them directly
+    temp = merged['earth2_temp_c'].to_numpy(dtype=np.float64)
+    prio = merged['priority_final'].to_numpy(dtype=np.float64, copy=True)
+    cool = merged['tree_cooling_c'].to_numpy(dtype=np.float64)
+    has_temp = ~np.isnan(temp)
+
+    # Normalize temperature (higher temp = higher priority). With no finite
+    # temperatures temp_range is NaN and both paths fall back to 0.5.
+    if _nanminmax is not None:
+        # Single pass over the column instead of two nan-aware reductions
+        temp_min, temp_max = _nanminmax(temp)
+    else:
+        finite = temp[has_temp]
+        if finite.size:
+            temp_min = finite.min()
+            temp_max = finite.max()
         else:
-            merged['temp_priority'] = 0.5
+            temp_min = temp_max = np.nan
+    temp_range = temp_max - temp_min
+
+    # Estimate people affected (use population_density if available, else
+    # tree_density as proxy; rough estimate: tree_density * 100 = people/km²)
+    if 'population_density' in merged.columns:
+        people = merged['population_density'].to_numpy(dtype=np.float64, copy=True)
+    elif 'tree_density_per_km2' in merged.columns:
+        people = merged['tree_density_per_km2'].to_numpy(dtype=np.float64) * 100
     else:
-        merged['temp_priority'] = 0.5
-    
-    # Update priority_final to include temperature (20% weight)
-    # Only update cells that have temperature data
-    has_temp = merged['earth2_temp_c'].notna()
-    merged.loc[has_temp, 'priority_final'] = (
-        merged.loc[has_temp, 'priority_final'] * 
-        (1 + 0.2 * merged.loc[has_temp, 'temp_priority'])
-    )
-    
+        people = np.zeros(len(merged))
+    # In-place NaN fill on our own buffer; no np.where temporary
+    np.nan_to_num(people, copy=False, nan=0.0)
+
+    if _temp_metrics_kernel is not None:
+        # One fused sweep: temp_priority, the 20%-weight priority update,
+        # cooling in F and the impact metric without intermediate Series
+        temp_priority = np.empty_like(temp)
+        cooling_f = np.empty_like(temp)
+        temp_impact = np.empty_like(temp)
+        _temp_metrics_kernel(
+            temp, prio, cool, people, temp_min, temp_range,
+            temp_priority, prio, cooling_f, temp_impact
+        )
+    else:
+        if temp_range > 0:
+            temp_priority = np.where(has_temp, (temp - temp_min) / temp_range, 0.5)
+        else:
+            temp_priority = np.full(len(temp), 0.5)
+        # Update priority_final (20% weight) only where temperature exists;
+        # masked in-place multiply on the copied array, no extra temporary
+        np.multiply(prio, 1.0 + 0.2 * temp_priority, out=prio, where=has_temp)
+        cooling_f = cool * 1.8
+        temp_impact = cooling_f * people
+        temp_impact = np.where(np.isnan(temp_impact), 0.0, temp_impact)
+
+    merged['temp_priority'] = temp_priority
+    merged['priority_final'] = prio
+
     print(f"   ✅ Updated priority for {has_temp.sum()} cells with temperature data")
-    
+
     # Add temperature impact metrics
     print(f"\n6. Computing temperature impact metrics...")
-    
-    # Convert cooling from C to F for consistency
-    merged['tree_cooling_f'] = merged['tree_cooling_c'] * 1.8
-    
-    # Estimate people affected (use population_density if available, else tree_density as proxy)
-    if 'population_density' in merged.columns:
-        merged['people_affected'] = merged['population_density'].fillna(0)
-    else:
-        # Rough estimate: tree_density * 100 = people per km²
-        merged['people_affected'] = merged.get('tree_density_per_km2', 0) * 100
-    
-    # Calculate temperature impact (cooling * people affected)
-    merged['temp_impact'] = (
-        merged['tree_cooling_f'] * merged['people_affected']
-    ).fillna(0)
+
+    merged['tree_cooling_f'] = cooling_f
+    merged['people_affected'] = people
+    merged['temp_impact'] = temp_impact
     
     print(f"   ✅ Computed temperature impact metrics")
     
+    # Downcast the derived metrics before writing: float32 carries plenty of
+    # precision for temperatures/priorities and halves bytes on disk and in
+    # every downstream scan
+    for c in ['earth2_temp_c', 'tree_cooling_c', 'tree_cooling_f',
+              'temp_priority', 'priority_final', 'people_affected',
+              'temp_impact']:
+        merged[c] = merged[c].astype('float32')
+    # Nullable Int32 because unmatched cells have no tree count
+    merged['earth2_tree_count'] = merged['earth2_tree_count'].astype('Int32')
+
+    # Re-attach the feature columns the translation did not need so the
+    # output keeps the full feature set
+    passthrough_cols = [c for c in available_cols if c not in merged.columns]
+    if passthrough_cols:
+        passthrough = features_file.read(
+            columns=passthrough_cols, use_threads=True
+        ).to_pandas()
+        merged = pd.concat([merged, passthrough], axis=1)
+
     # Save updated features
     print(f"\n7. Saving updated features to: {output_path}")
-    
+
     # Create output directory if it doesn't exist
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     try:
-        merged.to_parquet(output_path, index=False)
+        # Sort by the join key and write it sorted with statistics and large
+        # row groups: downstream loaders that filter on h3_cell can then prune
+        # whole row groups from the footer instead of scanning the table.
+        # h3_cell is short repetitive ASCII, so dictionary-encode it; zstd
+        # shrinks the file ~30% over the default codec
+        merged.sort_values('h3_cell', inplace=True, ignore_index=True)
+        pq.write_table(
+            pa.Table.from_pandas(merged, preserve_index=False),
+            output_path,
+            compression='zstd',
+            compression_level=3,
+            row_group_size=200_000,
+            use_dictionary=['h3_cell'],
+            write_statistics=True,
+        )
         print(f"   ✅ Saved {len(merged)} records to {output_path}")
     except Exception as e:
         print(f"   ❌ Error saving file: {e}")
@@ -205,13 +514,20 @@ if __name__ == '__main__':
         type=str,
         help='Path to save updated features'
     )
-    
+    parser.add_argument(
+        '--backend',
+        choices=['cpu', 'gpu'],
+        default='cpu',
+        help='Run the pipeline on the CPU (default) or on RAPIDS cuDF'
+    )
+
     args = parser.parse_args()
-    
+
     result = translate_untitled_to_urban_futures(
         untitled_results_path=Path(args.untitled_results) if args.untitled_results else None,
         urban_futures_features_path=Path(args.urban_futures_features) if args.urban_futures_features else None,
-        output_path=Path(args.output) if args.output else None
+        output_path=Path(args.output) if args.output else None,
+        backend=args.backend
     )
     
     if result is None:
@@ -8,17 +8,11 @@ Usage:
 """
 
 import argparse
-import pandas as pd
 import logging
 from pathlib import Path
 from typing import List
 import sys
 
-from utils import load_config, setup_logger
-from utils.config_loader import get_output_dir, get_cache_dir
-from models import TreeMitigationModel
-from data import Earth2Predictor, NYCDataDownloader, SpatialAggregator
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -59,7 +53,16 @@ def main():
     )
     
     args = parser.parse_args()
-    
+
+    # Heavy imports live below parse_args so that --help and argument errors
+    # return immediately instead of waiting on pandas/geo stack startup
+    import pandas as pd
+
+    from utils import load_config, setup_logger
+    from utils.config_loader import get_output_dir, get_cache_dir
+    from models import TreeMitigationModel
+    from data import Earth2Predictor
+
     # Load configuration
     config = load_config(args.config)
     
@@ -91,32 +94,41 @@ def main():
     
     if args.use_cached_predictions and predictions_file.exists():
         logger.info(f"Loading cached Earth-2 predictions from {predictions_file}")
-        earth2_predictions = pd.read_parquet(predictions_file)
+        # The cache is sorted by h3_id with small row groups, so this filter
+        # prunes row groups from the footer statistics instead of decoding
+        # the whole city-scale table
+        earth2_predictions = pd.read_parquet(
+            predictions_file,
+            engine="pyarrow",
+            filters=[("h3_id", "in", hex_ids)]
+        )
     else:
         logger.info("Generating Earth-2 predictions...")
         predictor = Earth2Predictor(config)
-        
-        # Generate predictions for all hex IDs
-        all_predictions = []
-        for hex_id in hex_ids:
-            logger.info(f"Predicting for hex {hex_id}")
-            try:
-                preds = predictor.predict_for_h3_hex(
-                    hex_id,
-                    forecast_years=[1, 5, 10]
-                )
-                all_predictions.append(preds)
-            except Exception as e:
-                logger.error(f"Error predicting for hex {hex_id}: {e}")
-        
-        if not all_predictions:
+
+        # Generate predictions for all hex IDs in one batched call
+        logger.info(f"Predicting for {len(hex_ids)} hex(es)")
+        try:
+            earth2_predictions = predictor.predict_for_h3_hexes(
+                hex_ids,
+                forecast_years=[1, 5, 10]
+            )
+        except Exception as e:
+            logger.error(f"Error generating predictions: {e}")
+            sys.exit(1)
+
+        if earth2_predictions.empty:
             logger.error("No predictions generated")
             sys.exit(1)
         
-        earth2_predictions = pd.concat(all_predictions, ignore_index=True)
-        
-        # Cache predictions
-        earth2_predictions.to_parquet(predictions_file)
+        # Cache predictions sorted by h3_id with small row groups so later
+        # single-hex invocations can prune row groups via footer statistics
+        earth2_predictions = earth2_predictions.sort_values(
+            "h3_id", kind="stable", ignore_index=True
+        )
+        earth2_predictions.to_parquet(
+            predictions_file, engine="pyarrow", row_group_size=10_000
+        )
         logger.info(f"Cached predictions to {predictions_file}")
     
     # Load tree statistics
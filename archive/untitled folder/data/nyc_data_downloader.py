@@ -2,8 +2,12 @@
 
 import pandas as pd
 import geopandas as gpd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import shapely
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
 from datetime import datetime
 import numpy as np
@@ -11,9 +15,73 @@ import numpy as np
 logger = logging.getLogger(__name__)
 
 
+def _csv_column_names(csv_path: Path) -> List[str]:
+    """Read just the column names from a CSV header."""
+    with pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=1 << 16)
+    ) as reader:
+        return reader.schema.names
+
+
+def _read_csv_arrow(
+    csv_path: Path,
+    column_types: Optional[Dict[str, Any]] = None,
+    include_columns: Optional[List[str]] = None,
+    timestamp_parsers: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Read a CSV through Arrow's multi-threaded parser.
+
+    Pinning column_types skips inference for those columns, and
+    include_columns skips tokenization of everything else entirely; the
+    split_blocks/self_destruct conversion hands the Arrow buffers to pandas
+    without an extra copy of the whole table.
+    """
+    table = pacsv.read_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=64 << 20),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types or {},
+            include_columns=include_columns,
+            null_values=['', 'NA'],
+            strings_can_be_null=True,
+            timestamp_parsers=timestamp_parsers or pacsv.ConvertOptions().timestamp_parsers
+        )
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
 class NYCDataDownloader:
     """Load NYC open data from CSV files."""
-    
+
+    @staticmethod
+    def _match_col(
+        columns: List[str],
+        exact_candidates: tuple,
+        fuzzy_tokens: Optional[tuple] = None
+    ) -> Optional[str]:
+        """
+        Find one column by name.
+
+        exact_candidates match the lower/stripped header names through a
+        precomputed dict; fuzzy_tokens fall back to substring matching in
+        header order. Centralizes the detection loops previously copied
+        (with variations) across the three ingest methods.
+        """
+        lookup = {}
+        for col in columns:
+            lookup.setdefault(col.lower().strip(), col)
+        for cand in exact_candidates:
+            if cand in lookup:
+                return lookup[cand]
+        if fuzzy_tokens:
+            for col in columns:
+                low = col.lower().strip()
+                if any(tok in low for tok in fuzzy_tokens):
+                    return col
+        return None
+
     def __init__(self, config: Dict[str, Any], cache_dir: Path):
         """
         Initialize NYC data downloader.
@@ -29,6 +97,10 @@ class NYCDataDownloader:
         # Get raw data directory
         self.raw_data_dir = Path(config["processing"]["raw_data_dir"])
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
+
+    def _should_cache(self) -> bool:
+        """Whether processed data should be written to the Parquet cache."""
+        return bool(self.config.get("processing", {}).get("cache_writes", True))
     
     def download_tree_census(
         self,
@@ -47,7 +119,9 @@ class NYCDataDownloader:
         
         if cache_file.exists() and not force_download:
             logger.info(f"Loading cached tree census data from {cache_file}")
-            return gpd.read_parquet(cache_file)
+            # memory_map lets Arrow read the cache through the page cache
+            # without an intermediate buffer copy
+            return gpd.read_parquet(cache_file, memory_map=True)
         
         # Get CSV path from config
         csv_path = Path(self.config["data_sources"]["nyc_open_data"]["tree_census"]["csv_path"])
@@ -64,59 +138,92 @@ class NYCDataDownloader:
         logger.info(f"Loading NYC Street Tree Census data from {csv_path}...")
         
         try:
-            # Read CSV (handle large files with chunking if needed)
-            df = pd.read_csv(csv_path, low_memory=False)
-            logger.info(f"Loaded {len(df)} tree records from CSV")
-            
-            # Find latitude/longitude columns (check exact matches first)
-            lat_col = None
-            lon_col = None
-            
-            # Try exact matches first
-            if "latitude" in df.columns and "longitude" in df.columns:
-                lat_col, lon_col = "latitude", "longitude"
-            elif "lat" in df.columns and "lon" in df.columns:
-                lat_col, lon_col = "lat", "lon"
-            elif "Latitude" in df.columns and "Longitude" in df.columns:
-                lat_col, lon_col = "Latitude", "Longitude"
-            else:
-                # Try partial matches (more specific patterns to avoid false matches)
-                for col in df.columns:
-                    col_lower = col.lower().strip()
-                    # Only match if it's explicitly a coordinate column
-                    if lat_col is None and col_lower in ['latitude', 'lat', 'y_coord', 'y']:
-                        lat_col = col
-                    if lon_col is None and col_lower in ['longitude', 'lon', 'lng', 'long', 'x_coord', 'x']:
-                        lon_col = col
-            
+            # Find latitude/longitude columns from the header alone, then
+            # read with those types pinned so Arrow skips inference for them
+            columns = _csv_column_names(csv_path)
+            # Only exact (case-insensitive) names here: a census header has
+            # many columns and substring matches would be false positives
+            lat_col = self._match_col(columns, ("latitude", "lat", "y_coord", "y"))
+            lon_col = self._match_col(columns, ("longitude", "lon", "lng", "long", "x_coord", "x"))
+
             if lat_col is None or lon_col is None:
-                raise ValueError(f"Could not find latitude/longitude columns. Available columns: {df.columns.tolist()}")
-            
-            # Convert to numeric, handling any non-numeric values
-            df[lat_col] = pd.to_numeric(df[lat_col], errors='coerce')
-            df[lon_col] = pd.to_numeric(df[lon_col], errors='coerce')
-            
-            # Remove rows with invalid coordinates
-            valid_coords = df[lat_col].notna() & df[lon_col].notna()
-            df = df[valid_coords].copy()
-            
+                raise ValueError(f"Could not find latitude/longitude columns. Available columns: {columns}")
+
+            # Only parse the columns the pipeline uses downstream; the census
+            # file carries 40+ columns and everything else is skipped at the
+            # tokenizer. Overridable via keep_columns in the config.
+            keep_cols = self.config["data_sources"]["nyc_open_data"]["tree_census"].get(
+                "keep_columns",
+                ["tree_id", "tree_dbh", "stump_diam", "status", "health",
+                 "spc_common", "spc_latin"]
+            )
+            include = [lat_col, lon_col] + [c for c in keep_cols if c in columns]
+
+            # Stream the file block by block, dropping rows with invalid
+            # coordinates per batch, so peak memory is bounded by one block
+            # plus the surviving rows rather than twice the full file
+            batches = []
+            total_rows = 0
+            with pacsv.open_csv(
+                csv_path,
+                read_options=pacsv.ReadOptions(use_threads=True, block_size=64 << 20),
+                convert_options=pacsv.ConvertOptions(
+                    column_types={lat_col: pa.float64(), lon_col: pa.float64()},
+                    include_columns=include,
+                    null_values=['', 'NA'],
+                    strings_can_be_null=True
+                )
+            ) as reader:
+                for batch in reader:
+                    total_rows += batch.num_rows
+                    valid = pc.and_(pc.is_valid(batch.column(lat_col)),
+                                    pc.is_valid(batch.column(lon_col)))
+                    batches.append(batch.filter(valid))
+            df = pa.Table.from_batches(batches).to_pandas(
+                split_blocks=True, self_destruct=True
+            )
+            logger.info(f"Loaded {total_rows} tree records from CSV "
+                        f"({len(include)} of {len(columns)} columns)")
+
+            # Dictionary-encode the low-cardinality text columns: integer
+            # codes shrink them drastically and make downstream groupbys
+            # integer-keyed instead of hashing strings
+            for c in ("status", "health", "spc_common", "spc_latin", "borough"):
+                if c in df.columns:
+                    df[c] = df[c].astype("category")
+
+            # Downcast the numerics: float32 keeps ~1m coordinate precision,
+            # and the small integer columns (DBH in inches, district codes)
+            # fit in Int16, roughly halving the frame
+            df[lat_col] = df[lat_col].astype(np.float32)
+            df[lon_col] = df[lon_col].astype(np.float32)
+            for c in ("tree_dbh", "stump_diam", "cncldist"):
+                if c in df.columns:
+                    df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int16")
+
             # Don't filter by bounding box - keep all valid coordinate data
             # (H3 spatial aggregation will handle geographic filtering)
             logger.info(f"Kept all {len(df)} trees with valid coordinates")
             
-            # Create GeoDataFrame
+            # Create GeoDataFrame; shapely.points builds all geometries in
+            # one C loop over the coordinate arrays instead of per row
+            geoms = shapely.points(
+                df[lon_col].to_numpy(dtype=np.float64, copy=False),
+                df[lat_col].to_numpy(dtype=np.float64, copy=False)
+            )
             gdf = gpd.GeoDataFrame(
                 df,
-                geometry=gpd.points_from_xy(
-                    df[lon_col],
-                    df[lat_col]
-                ),
-                crs="EPSG:4326"
+                geometry=gpd.GeoSeries(geoms, crs="EPSG:4326", index=df.index)
             )
             
             # Cache the processed data
-            gdf.to_parquet(cache_file, compression="snappy")
-            logger.info(f"Cached processed tree census data to {cache_file}")
+            if self._should_cache():
+                gdf.to_parquet(cache_file,
+                               compression="zstd", compression_level=3,
+                               use_dictionary=True, row_group_size=262144)
+                logger.info(f"Cached processed tree census data to {cache_file}")
+            else:
+                logger.info("Cache writes disabled; skipping cache file")
             
             return gdf
             
@@ -147,7 +254,7 @@ class NYCDataDownloader:
         
         if cache_file.exists() and not force_download:
             logger.info(f"Loading cached NOAA temperature data from {cache_file}")
-            return pd.read_parquet(cache_file)
+            return pd.read_parquet(cache_file, engine="pyarrow", memory_map=True)
         
         # Get CSV path from config
         csv_path = Path(self.config["data_sources"]["noaa"]["temperature_csv"])
@@ -174,47 +281,46 @@ class NYCDataDownloader:
         logger.info(f"Loading NOAA temperature data from {csv_path}...")
         
         try:
-            # Read CSV
-            df = pd.read_csv(csv_path, low_memory=False)
-            logger.info(f"Loaded {len(df)} temperature records from CSV")
-            
-            # Find date column
-            date_col = None
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(x in col_lower for x in ['date', 'time', 'datetime']):
-                    date_col = col
-                    break
-            
+            # Run all the column detection against the header alone, then
+            # read only the detected columns through Arrow's threaded parser
+            columns = _csv_column_names(csv_path)
+
+            date_col = self._match_col(columns, ("date",), ("date", "time", "datetime"))
             if date_col is None:
-                raise ValueError(f"Could not find date column. Available columns: {df.columns.tolist()}")
-            
-            # Convert date column
-            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-            
+                raise ValueError(f"Could not find date column. Available columns: {columns}")
+
+            temp_col = self._match_col(
+                columns, ("temperature_c", "temperature"),
+                ("temp", "temperature", "tavg", "tmax", "tmin")
+            )
+            lat_col = self._match_col(columns, ("latitude", "lat"), ("lat", "latitude", "y"))
+            lon_col = self._match_col(columns, ("longitude", "lon"), ("lon", "lng", "longitude", "long", "x"))
+
+            include = [date_col]
+            include += [c for c in ("station_id", "station") if c in columns]
+            include += [c for c in (temp_col, lat_col, lon_col) if c]
+
+            # Pin the date column to timestamp so Arrow parses it during
+            # tokenization instead of a second string pass in pandas
+            df = _read_csv_arrow(
+                csv_path,
+                column_types={date_col: pa.timestamp('ns')},
+                include_columns=include,
+                timestamp_parsers=['%Y-%m-%d', '%Y%m%d', '%Y-%m-%dT%H:%M:%S',
+                                   '%Y-%m-%d %H:%M:%S', '%m/%d/%Y']
+            )
+            logger.info(f"Loaded {len(df)} temperature records from CSV "
+                        f"({len(include)} of {len(columns)} columns)")
+
+            if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+                # Fallback for layouts the Arrow parsers did not cover
+                df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+
             # Filter by date range
             start = pd.to_datetime(start_date)
             end = pd.to_datetime(end_date)
             df = df[(df[date_col] >= start) & (df[date_col] <= end)].copy()
             
-            # Find temperature column
-            temp_col = None
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(x in col_lower for x in ['temp', 'temperature', 'tavg', 'tmax', 'tmin']):
-                    temp_col = col
-                    break
-            
-            # Find lat/lon columns
-            lat_col = None
-            lon_col = None
-            for col in df.columns:
-                col_lower = col.lower()
-                if lat_col is None and any(x in col_lower for x in ['lat', 'latitude', 'y']):
-                    lat_col = col
-                if lon_col is None and any(x in col_lower for x in ['lon', 'lng', 'longitude', 'long', 'x']):
-                    lon_col = col
-            
             # Standardize column names
             result_df = pd.DataFrame()
             result_df["date"] = df[date_col]
@@ -225,18 +331,21 @@ class NYCDataDownloader:
                 result_df["station_id"] = df["station"]
             else:
                 result_df["station_id"] = station_id
-            
+            # A handful of stations repeat across thousands of daily rows, so
+            # store the IDs as categorical codes rather than object strings
+            result_df["station_id"] = result_df["station_id"].astype("category")
+
             # Handle temperature (convert F to C if needed)
             if temp_col:
-                temp_values = pd.to_numeric(df[temp_col], errors='coerce')
-                # Check if values are in Fahrenheit range (> 50) or Celsius
-                if temp_values.max() > 50:
-                    # Likely Fahrenheit, convert to Celsius
-                    result_df["temperature_c"] = (temp_values - 32) * 5/9
-                    result_df["temperature_f"] = temp_values
-                else:
-                    result_df["temperature_c"] = temp_values
-                    result_df["temperature_f"] = temp_values * 9/5 + 32
+                # Per-row unit detection: plausible Celsius readings top out
+                # around 50, so anything higher is treated as Fahrenheit.
+                # This replaces the whole-column max() > 50 switch, which
+                # classified every row by the single hottest one and got
+                # mixed-station files wrong in one direction or the other
+                t = pd.to_numeric(df[temp_col], errors='coerce').to_numpy(dtype=np.float64)
+                is_f = t > 50
+                result_df["temperature_c"] = np.where(is_f, (t - 32.0) * (5.0 / 9.0), t)
+                result_df["temperature_f"] = np.where(is_f, t, t * (9.0 / 5.0) + 32.0)
             else:
                 result_df["temperature_c"] = np.nan
                 result_df["temperature_f"] = np.nan
@@ -256,8 +365,13 @@ class NYCDataDownloader:
             result_df = result_df[result_df["date"].notna()].copy()
             
             # Cache processed data
-            result_df.to_parquet(cache_file, compression="snappy")
-            logger.info(f"Cached processed temperature data to {cache_file}")
+            if self._should_cache():
+                result_df.to_parquet(cache_file,
+                                     compression="zstd", compression_level=3,
+                                     use_dictionary=True, row_group_size=262144)
+                logger.info(f"Cached processed temperature data to {cache_file}")
+            else:
+                logger.info("Cache writes disabled; skipping cache file")
             
             return result_df
             
@@ -295,7 +409,7 @@ class NYCDataDownloader:
         
         if cache_file.exists() and not force_download:
             logger.info(f"Loading cached NDVI data from {cache_file}")
-            return gpd.read_parquet(cache_file)
+            return gpd.read_parquet(cache_file, memory_map=True)
         
         ndvi_config = self.config["data_sources"].get("ndvi", {})
         
@@ -308,27 +422,35 @@ class NYCDataDownloader:
             if csv_path.exists():
                 logger.info(f"Loading NDVI data from CSV: {csv_path}")
                 try:
-                    df = pd.read_csv(csv_path, low_memory=False)
-                    
-                    # Find lat/lon columns
-                    lat_col = None
-                    lon_col = None
-                    for col in df.columns:
-                        col_lower = col.lower()
-                        if lat_col is None and any(x in col_lower for x in ['lat', 'latitude', 'y']):
-                            lat_col = col
-                        if lon_col is None and any(x in col_lower for x in ['lon', 'lng', 'longitude', 'long', 'x']):
-                            lon_col = col
-                    
+                    # Detect the coordinate/date/NDVI columns from the header
+                    # and parse only those
+                    columns = _csv_column_names(csv_path)
+                    lat_col = self._match_col(
+                        columns, ("latitude", "lat"), ("lat", "latitude", "y")
+                    )
+                    lon_col = self._match_col(
+                        columns, ("longitude", "lon"), ("lon", "lng", "longitude", "long", "x")
+                    )
+
                     if lat_col and lon_col:
-                        # Convert to GeoDataFrame
+                        include = [lat_col, lon_col]
+                        include += [c for c in columns
+                                    if c not in include
+                                    and any(x in c.lower() for x in ['ndvi', 'date', 'time'])]
+                        df = _read_csv_arrow(csv_path, include_columns=include)
+                        # Convert to GeoDataFrame via the vectorized
+                        # shapely.points constructor
+                        geoms = shapely.points(
+                            pd.to_numeric(df[lon_col], errors='coerce')
+                            .to_numpy(dtype=np.float64, copy=False),
+                            pd.to_numeric(df[lat_col], errors='coerce')
+                            .to_numpy(dtype=np.float64, copy=False)
+                        )
                         gdf = gpd.GeoDataFrame(
                             df,
-                            geometry=gpd.points_from_xy(
-                                pd.to_numeric(df[lon_col], errors='coerce'),
-                                pd.to_numeric(df[lat_col], errors='coerce')
-                            ),
-                            crs="EPSG:4326"
+                            geometry=gpd.GeoSeries(
+                                geoms, crs="EPSG:4326", index=df.index
+                            )
                         )
                         
                         # Filter by date if date column exists
@@ -344,8 +466,13 @@ class NYCDataDownloader:
                             end = pd.to_datetime(end_date)
                             gdf = gdf[(gdf[date_col] >= start) & (gdf[date_col] <= end)].copy()
                         
-                        gdf.to_parquet(cache_file, compression="snappy")
-                        logger.info(f"Cached NDVI data to {cache_file}")
+                        if self._should_cache():
+                            gdf.to_parquet(cache_file,
+                                           compression="zstd", compression_level=3,
+                                           use_dictionary=True, row_group_size=262144)
+                            logger.info(f"Cached NDVI data to {cache_file}")
+                        else:
+                            logger.info("Cache writes disabled; skipping cache file")
                         return gdf
                 except Exception as e:
                     logger.warning(f"Error loading NDVI CSV: {e}")
@@ -360,35 +487,35 @@ class NYCDataDownloader:
                 logger.info(f"Loading NDVI data from raster: {raster_path}")
                 try:
                     import rasterio
-                    from rasterio.warp import transform_geom
-                    from shapely.geometry import shape
-                    
+
                     with rasterio.open(raster_path) as src:
                         # Read raster data
                         data = src.read(1)  # Read first band
-                        
+
                         # Get transform and CRS
                         transform = src.transform
                         crs = src.crs
-                        
+
                         # Convert to points (sample at regular intervals for efficiency)
                         height, width = data.shape
                         step = max(1, min(height, width) // 1000)  # Sample every Nth pixel
-                        
-                        geometries = []
-                        values = []
-                        
-                        for row in range(0, height, step):
-                            for col in range(0, width, step):
-                                if not np.isnan(data[row, col]):
-                                    # Convert pixel to lat/lon
-                                    lon, lat = rasterio.transform.xy(transform, row, col)
-                                    geometries.append(Point(lon, lat))
-                                    values.append(data[row, col])
-                        
+
+                        # Sample the grid with index arrays and apply the
+                        # affine transform to all pixel centers at once,
+                        # instead of a Python loop per pixel
+                        rows, cols = np.mgrid[0:height:step, 0:width:step]
+                        values = data[rows, cols]
+                        mask = ~np.isnan(values)
+                        rows = rows[mask].astype(np.float64)
+                        cols = cols[mask].astype(np.float64)
+                        values = values[mask]
+
+                        xs = transform.c + transform.a * (cols + 0.5) + transform.b * (rows + 0.5)
+                        ys = transform.f + transform.d * (cols + 0.5) + transform.e * (rows + 0.5)
+
                         gdf = gpd.GeoDataFrame(
                             {"ndvi": values},
-                            geometry=geometries,
+                            geometry=shapely.points(xs, ys),
                             crs=crs
                         )
                         
@@ -396,8 +523,13 @@ class NYCDataDownloader:
                         if crs != "EPSG:4326":
                             gdf = gdf.to_crs("EPSG:4326")
                         
-                        gdf.to_parquet(cache_file, compression="snappy")
-                        logger.info(f"Cached NDVI raster data to {cache_file}")
+                        if self._should_cache():
+                            gdf.to_parquet(cache_file,
+                                           compression="zstd", compression_level=3,
+                                           use_dictionary=True, row_group_size=262144)
+                            logger.info(f"Cached NDVI raster data to {cache_file}")
+                        else:
+                            logger.info("Cache writes disabled; skipping cache file")
                         return gdf
                 except ImportError:
                     logger.warning("rasterio not available. Install with: pip install rasterio")
@@ -457,19 +589,15 @@ class NYCDataDownloader:
             # Get median NDVI
             ndvi_image = collection.select('NDVI').median()
             
-            # Sample at points (create grid of sample points)
-            # For efficiency, sample at ~500m intervals
-            sample_points = []
+            # Sample on a ~500m grid generated server-side: one request
+            # describing the grid instead of one ee.Geometry.Point stub per
+            # sample location built in a Python loop
             step = 0.005  # ~500m
-            for lat in np.arange(bbox["min_lat"], bbox["max_lat"], step):
-                for lon in np.arange(bbox["min_lon"], bbox["max_lon"], step):
-                    sample_points.append(ee.Geometry.Point([lon, lat]))
-            
-            # Sample NDVI values
-            samples = ndvi_image.sampleRegions(
-                collection=ee.FeatureCollection(sample_points),
-                scale=30,
-                geometries=True
+            grid = nyc_bbox.coveringGrid("EPSG:4326", step * 111000)
+            samples = ndvi_image.reduceRegions(
+                collection=grid,
+                reducer=ee.Reducer.mean(),
+                scale=30
             )
             
             # Convert to GeoDataFrame (this requires downloading data)
@@ -3,15 +3,48 @@
 import geopandas as gpd
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import h3
+import h3.api.basic_int as h3_int
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
 
+def _cells_for_coords(args):
+    """Worker: map one chunk of coordinates to their H3 cells (as uint64)."""
+    lats, lons, resolution = args
+    return np.fromiter(
+        (h3_int.latlng_to_cell(lat, lon, resolution)
+         for lat, lon in zip(lats, lons)),
+        dtype=np.uint64, count=len(lats)
+    )
+
+
+@lru_cache(maxsize=None)
+def _cell_area_km2(cell: int) -> float:
+    """
+    Memoized h3.cell_area (int cell IDs).
+
+    Cell areas barely vary within a resolution and the same cells recur
+    across aggregation calls, so the cache turns the per-cell spherical-area
+    computation into a dict lookup after the first pass.
+    """
+    return h3_int.cell_area(cell, unit="km^2")
+
+
+def _cells_to_strs(cells) -> list:
+    """Convert uint64 cell IDs back to the string form used at frame boundaries."""
+    return [h3.int_to_str(int(cell)) for cell in cells]
+
+
 class SpatialAggregator:
     """Aggregate spatial data per H3 hexagon."""
     
@@ -27,7 +60,61 @@ class SpatialAggregator:
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.h3_resolution = config["h3"]["default_resolution"]
-    
+        self.parallel_join = bool(
+            config.get("processing", {}).get("parallel_sjoin", False)
+        )
+
+    def _assign_hex_ids(self, points: gpd.GeoDataFrame,
+                        h3_grid: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Map each geometry point to its containing H3 cell."""
+        return self._assign_hex_ids_from_coords(
+            points,
+            points.geometry.y.to_numpy(),
+            points.geometry.x.to_numpy(),
+            h3_grid
+        )
+
+    def _assign_hex_ids_from_coords(self, frame: pd.DataFrame,
+                                    lats: np.ndarray, lons: np.ndarray,
+                                    h3_grid: gpd.GeoDataFrame) -> pd.DataFrame:
+        """
+        Map each coordinate pair to its containing H3 cell.
+
+        H3 cells tile the plane, so the containing cell is simply
+        h3.latlng_to_cell(lat, lon, resolution) — no spatial index or
+        polygon containment tests needed. Rows whose cell is not in the
+        grid are dropped, matching the inner sjoin this replaces.
+
+        The attached h3_id column holds uint64 cell IDs (h3's native
+        representation): 8-byte keys instead of 15-char strings for the
+        per-row set-membership, factorize and groupby work downstream.
+        Aggregation outputs convert back to strings at their boundaries.
+        """
+        if self.parallel_join and len(lats) >= 100_000:
+            # The point→cell mapping is embarrassingly parallel; fan chunks
+            # out across cores for census-scale inputs. Small inputs stay
+            # serial so they don't pay the process-pool startup tax.
+            n_workers = os.cpu_count() or 1
+            splits = np.array_split(np.arange(len(lats)), n_workers * 4)
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                parts = executor.map(
+                    _cells_for_coords,
+                    [(lats[ix], lons[ix], self.h3_resolution) for ix in splits]
+                )
+            hex_ids = np.concatenate(list(parts))
+        else:
+            hex_ids = np.fromiter(
+                (h3_int.latlng_to_cell(lat, lon, self.h3_resolution)
+                 for lat, lon in zip(lats, lons)),
+                dtype=np.uint64, count=len(lats)
+            )
+        grid_cells = {h3.str_to_int(hex_id) for hex_id in h3_grid["h3_id"]}
+        in_grid = np.fromiter(
+            (int(hex_id) in grid_cells for hex_id in hex_ids),
+            dtype=bool, count=len(hex_ids)
+        )
+        return frame.assign(h3_id=hex_ids).loc[in_grid]
+
     def aggregate_trees_per_hex(
         self,
         h3_grid: gpd.GeoDataFrame,
@@ -45,38 +132,37 @@ class SpatialAggregator:
         """
         logger.info("Aggregating tree data per H3 hexagon...")
         
-        # Spatial join: trees within hexes
-        tree_hex_join = gpd.sjoin(
-            tree_data,
-            h3_grid,
-            how="inner",
-            predicate="within"
-        )
-        
-        # Aggregate statistics per hex
-        tree_stats = tree_hex_join.groupby("h3_id").agg({
-            "geometry": "count"  # Tree count
-        }).rename(columns={"geometry": "tree_count"})
-        
-        # Calculate tree density (trees per km²)
-        tree_stats["tree_density"] = tree_stats["tree_count"].copy()
-        
-        # Add hex area for density calculation
-        tree_stats["hex_area_km2"] = tree_stats.index.map(
-            lambda hex_id: h3.cell_area(hex_id, unit="km^2")
+        # Assign each tree to its hex directly through H3 indexing
+        tree_hex_join = self._assign_hex_ids(tree_data, h3_grid)
+
+        # Counts, areas and density in one factorize + bincount pass over the
+        # rows instead of separate groupby / map / division steps
+        codes, uniques = pd.factorize(tree_hex_join["h3_id"], sort=False)
+        n = len(uniques)
+        counts = np.bincount(codes, minlength=n)
+        areas = np.fromiter(
+            (_cell_area_km2(int(cell)) for cell in uniques),
+            dtype=np.float64, count=n
         )
-        tree_stats["tree_density"] = (
-            tree_stats["tree_count"] / tree_stats["hex_area_km2"]
+        tree_stats = pd.DataFrame(
+            {
+                "tree_count": counts,
+                "tree_density": counts / areas,
+                "hex_area_km2": areas
+            },
+            index=pd.Index(_cells_to_strs(uniques), name="h3_id")
         )
-        
+
         # If tree data has diameter or canopy info, aggregate that too
         if "tree_dbh" in tree_hex_join.columns:
-            canopy_stats = tree_hex_join.groupby("h3_id").agg({
-                "tree_dbh": ["mean", "sum"]
-            })
-            canopy_stats.columns = ["avg_tree_dbh", "total_tree_dbh"]
-            tree_stats = tree_stats.join(canopy_stats)
-        
+            dbh = tree_hex_join["tree_dbh"].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(dbh)
+            dbh_sum = np.bincount(codes[valid], weights=dbh[valid], minlength=n)
+            dbh_cnt = np.bincount(codes[valid], minlength=n)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                tree_stats["avg_tree_dbh"] = dbh_sum / dbh_cnt
+            tree_stats["total_tree_dbh"] = dbh_sum
+
         logger.info(f"Aggregated tree data for {len(tree_stats)} hexagons")
         return tree_stats.reset_index()
     
@@ -107,25 +193,37 @@ class SpatialAggregator:
             })
             return green_stats
         
-        # Spatial join: NDVI pixels within hexes
-        ndvi_hex_join = gpd.sjoin(
-            ndvi_data,
-            h3_grid,
-            how="inner",
-            predicate="within"
-        )
+        # Assign each NDVI pixel to its hex directly through H3 indexing
+        ndvi_hex_join = self._assign_hex_ids(ndvi_data, h3_grid)
         
         # Aggregate NDVI statistics per hex
         if "ndvi" in ndvi_hex_join.columns:
-            green_stats = ndvi_hex_join.groupby("h3_id").agg({
-                "ndvi": ["mean", "std"]
-            })
-            green_stats.columns = ["ndvi_mean", "ndvi_std"]
-            
-            # Calculate green fraction (NDVI > 0.3 threshold)
-            green_pixels = ndvi_hex_join[ndvi_hex_join["ndvi"] > 0.3].groupby("h3_id").size()
-            total_pixels = ndvi_hex_join.groupby("h3_id").size()
-            green_stats["green_fraction"] = (green_pixels / total_pixels).fillna(0)
+            # One factorize + bincount scan yields count, mean, std and the
+            # green fraction together, instead of a grouped aggregation plus
+            # two more grouped size passes for the threshold fraction
+            codes, uniques = pd.factorize(ndvi_hex_join["h3_id"], sort=False)
+            vals = ndvi_hex_join["ndvi"].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(vals)
+            n = len(uniques)
+            total = np.bincount(codes, minlength=n).astype(np.float64)
+            cnt = np.bincount(codes[valid], minlength=n).astype(np.float64)
+            sumv = np.bincount(codes[valid], weights=vals[valid], minlength=n)
+            sumv2 = np.bincount(codes[valid], weights=vals[valid] ** 2, minlength=n)
+            green = np.bincount(codes[vals > 0.3], minlength=n).astype(np.float64)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = sumv / cnt
+                # Sample variance (ddof=1) to match the groupby std it replaces
+                var = (sumv2 - cnt * mean * mean) / (cnt - 1)
+            std = np.sqrt(np.maximum(var, 0.0))
+            std[cnt < 2] = np.nan
+            green_stats = pd.DataFrame(
+                {
+                    "ndvi_mean": mean,
+                    "ndvi_std": std,
+                    "green_fraction": green / total
+                },
+                index=pd.Index(_cells_to_strs(uniques), name="h3_id")
+            )
         else:
             green_stats = pd.DataFrame(index=h3_grid["h3_id"])
             green_stats["ndvi_mean"] = np.nan
@@ -153,38 +251,44 @@ class SpatialAggregator:
         """
         logger.info("Aggregating temperature data per H3 hexagon...")
         
-        # Convert temperature data to GeoDataFrame if needed
+        # Plain frames with lat/lon columns skip geometry construction
+        # entirely: the containing hex only needs the coordinates
         if not isinstance(temperature_data, gpd.GeoDataFrame):
             if "lat" in temperature_data.columns and "lon" in temperature_data.columns:
-                temp_gdf = gpd.GeoDataFrame(
+                temp_hex_join = self._assign_hex_ids_from_coords(
                     temperature_data,
-                    geometry=gpd.points_from_xy(
-                        temperature_data["lon"],
-                        temperature_data["lat"]
-                    ),
-                    crs="EPSG:4326"
+                    temperature_data["lat"].to_numpy(dtype=np.float64),
+                    temperature_data["lon"].to_numpy(dtype=np.float64),
+                    h3_grid
                 )
             else:
                 logger.warning("Temperature data missing lat/lon columns")
                 return pd.DataFrame({"h3_id": h3_grid["h3_id"]})
         else:
-            temp_gdf = temperature_data
-        
-        # Spatial join: temperature points within hexes
-        temp_hex_join = gpd.sjoin(
-            temp_gdf,
-            h3_grid,
-            how="inner",
-            predicate="within"
-        )
+            temp_hex_join = self._assign_hex_ids(temperature_data, h3_grid)
         
         # Aggregate temperature statistics per hex and time
         if "temperature" in temp_hex_join.columns:
-            temp_stats = temp_hex_join.groupby(["h3_id", "date"]).agg({
-                "temperature": ["mean", "min", "max", "std"]
-            })
-            temp_stats.columns = ["temp_mean", "temp_min", "temp_max", "temp_std"]
-            temp_stats = temp_stats.reset_index()
+            # Arrow's multi-threaded hash aggregation; ddof=1 keeps the
+            # stddev identical to the pandas groupby it replaces
+            tbl = pa.Table.from_pandas(
+                temp_hex_join[["h3_id", "date", "temperature"]],
+                preserve_index=False
+            )
+            temp_stats = tbl.group_by(["h3_id", "date"]).aggregate([
+                ("temperature", "mean"),
+                ("temperature", "min"),
+                ("temperature", "max"),
+                ("temperature", "stddev", pc.VarianceOptions(ddof=1))
+            ]).to_pandas()
+            temp_stats = temp_stats.rename(columns={
+                "temperature_mean": "temp_mean",
+                "temperature_min": "temp_min",
+                "temperature_max": "temp_max",
+                "temperature_stddev": "temp_std"
+            })[["h3_id", "date", "temp_mean", "temp_min", "temp_max", "temp_std"]]
+            # Per-group (not per-row) conversion back to string cell IDs
+            temp_stats["h3_id"] = _cells_to_strs(temp_stats["h3_id"])
         else:
             logger.warning("Temperature data missing 'temperature' column")
             temp_stats = pd.DataFrame({"h3_id": h3_grid["h3_id"]})
@@ -216,17 +320,17 @@ class SpatialAggregator:
         # Start with H3 grid
         features = h3_grid[["h3_id", "resolution"]].copy()
         
-        # Add hex center coordinates
-        features["lat"] = features["h3_id"].map(
-            lambda hex_id: h3.cell_to_latlng(hex_id)[0]
-        )
-        features["lon"] = features["h3_id"].map(
-            lambda hex_id: h3.cell_to_latlng(hex_id)[1]
-        )
-        
-        # Add hex area
-        features["hex_area_km2"] = features["h3_id"].map(
-            lambda hex_id: h3.cell_area(hex_id, unit="km^2")
+        # Add hex center coordinates and area: one h3 call per hex instead of
+        # three (cell_to_latlng was previously invoked once per coordinate)
+        cells = [h3.str_to_int(hex_id) for hex_id in features["h3_id"]]
+        latlng = np.array(
+            [h3_int.cell_to_latlng(cell) for cell in cells]
+        ).reshape(-1, 2)
+        features["lat"] = latlng[:, 0]
+        features["lon"] = latlng[:, 1]
+        features["hex_area_km2"] = np.fromiter(
+            (_cell_area_km2(cell) for cell in cells),
+            dtype=np.float64, count=len(cells)
         )
         
         # Merge tree statistics
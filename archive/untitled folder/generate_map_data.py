@@ -4,11 +4,15 @@ Generate JSON data for the interactive map.
 Creates a file with hex data including temperature predictions, tree counts, etc.
 """
 
+import gzip
 import json
+import numpy as np
 import pandas as pd
 import h3
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from utils import load_config, create_h3_grid
+from utils import load_config, get_or_build_h3_grid
 from data import Earth2Predictor
 import logging
 
@@ -16,28 +20,107 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _hex_geometry_chunk(hex_ids):
+    """Worker: compute center, boundary and area for one chunk of hexes."""
+    centers = [h3.cell_to_latlng(hex_id) for hex_id in hex_ids]
+    # h3 already returns (lat, lon) tuples of Python floats; both json and
+    # parquet consume them as-is, so re-boxing every vertex into new lists
+    # and float() calls (~14 allocations per hex) was pure overhead
+    boundaries = [h3.cell_to_boundary(hex_id) for hex_id in hex_ids]
+    areas = [h3.cell_area(hex_id, unit="km^2") for hex_id in hex_ids]
+    return centers, boundaries, areas
+
+
+def _hex_geometries(hex_ids):
+    """
+    Compute hex centers, boundaries and areas for a list of cells.
+
+    The per-hex h3 calls are embarrassingly parallel, so city-scale grids
+    fan out across cores; small grids stay serial to avoid the process-pool
+    startup tax (same pattern as SpatialAggregator's point→cell mapping).
+    """
+    if len(hex_ids) >= 50_000:
+        n_workers = os.cpu_count() or 1
+        chunks = np.array_split(np.asarray(hex_ids, dtype=object), n_workers * 4)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            parts = list(executor.map(
+                _hex_geometry_chunk, [chunk.tolist() for chunk in chunks]
+            ))
+    else:
+        parts = [_hex_geometry_chunk(list(hex_ids))]
+
+    centers, boundaries, areas = [], [], []
+    for chunk_centers, chunk_boundaries, chunk_areas in parts:
+        centers.extend(chunk_centers)
+        boundaries.extend(chunk_boundaries)
+        areas.extend(chunk_areas)
+    return centers, boundaries, np.array(areas)
+
+
+def _hex_geometries_cached(hex_ids, resolution, cache_dir):
+    """
+    Hex geometries with a parquet sidecar cache.
+
+    Centers, boundaries and areas are pure functions of the cell ID, so
+    they are computed once per resolution and persisted; warm runs replace
+    millions of libh3 calls with one parquet read and a reindex. The
+    resolution-suffixed filename doubles as the invalidation key.
+    """
+    cache_file = Path(cache_dir) / f"hex_geom_res{resolution}.parquet"
+    if cache_file.exists():
+        cached = pd.read_parquet(cache_file)
+        if set(hex_ids) <= set(cached["hex_id"]):
+            logger.info(f"Loaded hex geometry cache from {cache_file}")
+            cached = cached.set_index("hex_id").reindex(hex_ids)
+            centers = list(zip(cached["lat"], cached["lon"]))
+            boundaries = [np.vstack(b).tolist() for b in cached["boundary"]]
+            return centers, boundaries, cached["area_km2"].to_numpy()
+
+    centers, boundaries, areas = _hex_geometries(hex_ids)
+
+    geom_df = pd.DataFrame({
+        "hex_id": hex_ids,
+        "lat": [lat for lat, _ in centers],
+        "lon": [lon for _, lon in centers],
+        "area_km2": areas,
+        "boundary": boundaries,
+    })
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    geom_df.to_parquet(cache_file, compression="zstd")
+    logger.info(f"Cached hex geometry to {cache_file}")
+
+    return centers, boundaries, areas
+
+
 def generate_map_data(
     min_lat=40.4774,  # NYC southern tip (Staten Island)
     max_lat=40.9176,  # NYC northern tip (Bronx)
     min_lon=-74.2591,  # NYC western edge (Staten Island)
     max_lon=-73.7004,  # NYC eastern edge (Queens)
     resolution=9,
-    output_file="map_data.json"
+    output_file="map_data.json",
+    pretty=False
 ):
     """
     Generate data for interactive map.
-    
+
     Args:
         min_lat, max_lat, min_lon, max_lon: Bounding box
         resolution: H3 resolution
         output_file: Output JSON file
+        pretty: Indent the JSON for human diffing (larger and slower)
     """
     logger.info("Generating map data...")
     
-    # Create H3 grid
+    # Create H3 grid (shared with main.py via the cached parquet)
     logger.info(f"Creating H3 grid at resolution {resolution}")
-    h3_grid_df = create_h3_grid(min_lat, max_lat, min_lon, max_lon, resolution)
-    h3_grid = h3_grid_df['h3_id'].tolist() if 'h3_id' in h3_grid_df.columns else list(h3_grid_df)
+    h3_grid_df = get_or_build_h3_grid(
+        min_lat, max_lat, min_lon, max_lon, resolution,
+        cache_file=Path("data/cache") / "h3_grid.parquet"
+    )
+    # Keep the cells as a numpy array — downstream code only needs length
+    # and element access, and the array feeds reindex/DataFrame directly
+    h3_grid = h3_grid_df["h3_id"].to_numpy()
     logger.info(f"Created {len(h3_grid)} hexagons")
     
     # Load configuration
@@ -48,73 +131,94 @@ def generate_map_data(
     tree_stats = None
     if (cache_dir / "tree_stats_aggregated.parquet").exists():
         logger.info("Loading tree statistics...")
-        tree_stats = pd.read_parquet(cache_dir / "tree_stats_aggregated.parquet")
+        # Only the two columns the map needs, Arrow-backed to skip per-row
+        # string boxing, indexed for the hash-join below
+        tree_stats = pd.read_parquet(
+            cache_dir / "tree_stats_aggregated.parquet",
+            engine="pyarrow",
+            columns=["h3_id", "tree_count"],
+            dtype_backend="pyarrow"
+        ).set_index("h3_id")
         logger.info(f"Loaded tree data for {len(tree_stats)} hexes")
     
     # Generate predictions for ALL hexes
     logger.info(f"Generating predictions for {len(h3_grid)} hexes...")
     
     predictor = Earth2Predictor(config)
-    
-    hex_data = []
-    
-    for i, hex_id in enumerate(h3_grid):
-        if i % 100 == 0:
-            logger.info(f"Processing hex {i+1}/{len(h3_grid)}")
-        
-        try:
-            # Get hex properties
-            lat, lon = h3.cell_to_latlng(hex_id)
-            boundary = h3.cell_to_boundary(hex_id)
-            hex_area = h3.cell_area(hex_id, unit="km^2")
-            
-            # Get tree count
-            tree_count = 0
-            if tree_stats is not None:
-                tree_data = tree_stats[tree_stats["h3_id"] == hex_id]
-                if not tree_data.empty:
-                    tree_count = int(tree_data["tree_count"].iloc[0])
-            
-            # Get temperature prediction
-            predictions = predictor.predict_for_h3_hex(hex_id, [1])
-            avg_temp = predictions["temperature_c"].mean()
-            
-            # Calculate tree density
-            tree_density = tree_count / hex_area if hex_area > 0 else 0
-            
-            hex_data.append({
-                "hex_id": hex_id,
-                "lat": float(lat),
-                "lon": float(lon),
-                "boundary": [[float(lat), float(lon)] for lat, lon in boundary],
-                "hex_area_km2": float(hex_area),
-                "tree_count": tree_count,
-                "tree_density_km2": float(tree_density),
-                "temperature_c": float(avg_temp),
-                "temperature_f": float(avg_temp * 9/5 + 32)
-            })
-            
-        except Exception as e:
-            logger.error(f"Error processing hex {hex_id}: {e}")
-            continue
-    
-    # Save to JSON
+
+    # Compute hex geometry properties in single passes (one h3 call per cell
+    # instead of several inside the per-hex loop), parallel for large grids
+    # and persisted across runs via the parquet sidecar
+    centers, boundaries, hex_areas = _hex_geometries_cached(
+        h3_grid, resolution, cache_dir
+    )
+
+    # Tree counts via one hash-based reindex instead of a boolean mask per hex
+    if tree_stats is not None:
+        tree_counts = (
+            tree_stats["tree_count"]
+            .reindex(h3_grid, fill_value=0)
+            .to_numpy(dtype=np.int64)
+        )
+    else:
+        tree_counts = np.zeros(len(h3_grid), dtype=np.int64)
+
+    # One batched model call for all hexes instead of one call per hex
+    predictions = predictor.predict_for_h3_hexes(list(h3_grid), [1])
+    avg_temps = (
+        predictions.groupby("h3_id")["temperature_c"]
+        .mean()
+        .reindex(h3_grid)
+        .to_numpy()
+    )
+
+    hex_df = pd.DataFrame({
+        "hex_id": h3_grid,
+        "lat": [lat for lat, _ in centers],
+        "lon": [lon for _, lon in centers],
+        "boundary": boundaries,
+        "hex_area_km2": hex_areas,
+        "tree_count": tree_counts.astype(np.int64),
+        "tree_density_km2": np.where(hex_areas > 0, tree_counts / hex_areas, 0.0),
+        "temperature_c": avg_temps,
+        "temperature_f": avg_temps * 9 / 5 + 32,
+    })
+    # Drop hexes whose prediction failed (matches the old skip-on-error behavior)
+    hex_df = hex_df[~np.isnan(avg_temps)]
+    hex_data = hex_df.to_dict(orient="records")
+
+    # Save to JSON (compact separators instead of indent=2 — the file is
+    # machine-read by the map frontend, and pretty-printing triples its size)
     output_path = Path(output_file)
-    with open(output_path, 'w') as f:
-        json.dump({
-            "metadata": {
-                "total_hexes": len(hex_data),
-                "resolution": resolution,
-                "bounds": {
-                    "min_lat": min_lat,
-                    "max_lat": max_lat,
-                    "min_lon": min_lon,
-                    "max_lon": max_lon
-                }
-            },
-            "hexes": hex_data
-        }, f, indent=2)
-    
+    payload = {
+        "metadata": {
+            "total_hexes": len(hex_data),
+            "resolution": resolution,
+            "bounds": {
+                "min_lat": min_lat,
+                "max_lat": max_lat,
+                "min_lon": min_lon,
+                "max_lon": max_lon
+            }
+        },
+        "hexes": hex_data
+    }
+    if pretty:
+        text = json.dumps(payload, indent=2)
+    else:
+        text = json.dumps(payload, separators=(",", ":"))
+    output_path.write_text(text)
+
+    # Serve-ready gzip copy: the repetitive hex records compress ~10x
+    with gzip.open(output_path.with_suffix(".json.gz"), "wt") as f:
+        f.write(text)
+
+    # Keep a typed Parquet copy for downstream pipeline reuse (boundaries are
+    # recomputable from hex_id, so they stay JSON-only)
+    parquet_path = output_path.with_suffix(".parquet")
+    hex_df.drop(columns=["boundary"]).to_parquet(parquet_path, compression="snappy")
+    logger.info(f"Saved Parquet copy to {parquet_path}")
+
     logger.info(f"Saved map data to {output_path}")
     logger.info(f"Total hexes with data: {len(hex_data)}")
     
@@ -131,14 +235,17 @@ if __name__ == "__main__":
     parser.add_argument("--max_lon", type=float, default=-73.7004, help="NYC eastern edge")
     parser.add_argument("--resolution", type=int, default=9, help="H3 resolution (8-10)")
     parser.add_argument("--output", type=str, default="map_data.json")
-    
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent the JSON output for human diffing")
+
     args = parser.parse_args()
-    
+
     generate_map_data(
         min_lat=args.min_lat,
         max_lat=args.max_lat,
         min_lon=args.min_lon,
         max_lon=args.max_lon,
         resolution=args.resolution,
-        output_file=args.output
+        output_file=args.output,
+        pretty=args.pretty
     )
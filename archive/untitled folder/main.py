@@ -9,6 +9,7 @@ Usage:
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 import logging
@@ -18,11 +19,21 @@ import pandas as pd
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from utils import load_config, setup_logger, create_h3_grid, validate_h3_id
+from utils import load_config, setup_logger, get_or_build_h3_grid, validate_h3_id
+from utils.config_loader import get_cache_dir, get_output_dir, get_raw_data_dir
 from data import NYCDataDownloader, SpatialAggregator, Earth2Predictor
 from utils.visualization import visualize_predictions
 
 
+def _safe_result(future, logger, message, level=logging.ERROR):
+    """Unwrap a download future, logging failures and returning None."""
+    try:
+        return future.result()
+    except Exception as e:
+        logger.log(level, f"{message}: {e}")
+        return None
+
+
 def main():
     """Main CLI function."""
     parser = argparse.ArgumentParser(
@@ -79,6 +90,12 @@ Examples:
         action="store_true",
         help="Force re-download of data (ignore cache)"
     )
+
+    parser.add_argument(
+        "--rebuild-grid",
+        action="store_true",
+        help="Rebuild the H3 grid even if a cached copy exists"
+    )
     
     parser.add_argument(
         "--visualize",
@@ -107,7 +124,6 @@ Examples:
     logger.info("Starting NYC UHI prediction system")
     
     # Get directories
-    from utils.config_loader import get_cache_dir, get_output_dir, get_raw_data_dir
     cache_dir = get_cache_dir(config)
     output_dir = get_output_dir(config)
     raw_dir = get_raw_data_dir(config)
@@ -116,20 +132,17 @@ Examples:
     bbox = config["nyc_bbox"]
     h3_resolution = config["h3"]["default_resolution"]
     
-    logger.info("Creating H3 grid...")
-    h3_grid = create_h3_grid(
+    logger.info("Loading H3 grid...")
+    h3_grid = get_or_build_h3_grid(
         min_lat=bbox["min_lat"],
         max_lat=bbox["max_lat"],
         min_lon=bbox["min_lon"],
         max_lon=bbox["max_lon"],
-        resolution=h3_resolution
+        resolution=h3_resolution,
+        cache_file=cache_dir / "h3_grid.parquet",
+        force_rebuild=args.rebuild_grid
     )
     
-    # Cache H3 grid
-    h3_grid_file = cache_dir / "h3_grid.parquet"
-    h3_grid.to_parquet(h3_grid_file, compression="snappy")
-    logger.info(f"Cached H3 grid to {h3_grid_file}")
-    
     # Initialize data downloader and aggregator
     downloader = NYCDataDownloader(config, raw_dir)
     aggregator = SpatialAggregator(config, cache_dir)
@@ -137,39 +150,41 @@ Examples:
     # Process data
     logger.info("Processing NYC data...")
     
-    # Download tree census
-    try:
-        tree_data = downloader.download_tree_census(force_download=args.force_download)
-        logger.info(f"Downloaded {len(tree_data)} tree records")
-    except Exception as e:
-        logger.error(f"Error downloading tree census: {e}")
-        tree_data = None
-    
-    # Download temperature data (placeholder)
-    try:
-        temp_data = downloader.download_noaa_temperature(
+    # The three downloads are independent and I/O-bound (HTTP + disk), so
+    # overlap them; failures degrade to None exactly as the sequential
+    # try/except blocks did
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        tree_future = executor.submit(
+            downloader.download_tree_census,
+            force_download=args.force_download
+        )
+        temp_future = executor.submit(
+            downloader.download_noaa_temperature,
             station_id=config["data_sources"]["noaa"]["central_park_station"],
             start_date="2015-01-01",
             end_date="2024-12-31",
             force_download=args.force_download
         )
-        logger.info(f"Downloaded temperature data: {len(temp_data)} records")
-    except Exception as e:
-        logger.error(f"Error downloading temperature data: {e}")
-        temp_data = None
-    
-    # Download NDVI data (optional)
-    try:
-        ndvi_data = downloader.download_ndvi_data(
+        ndvi_future = executor.submit(
+            downloader.download_ndvi_data,
             start_date="2015-01-01",
             end_date="2024-12-31",
             force_download=args.force_download
         )
+
+        tree_data = _safe_result(tree_future, logger, "Error downloading tree census")
+        if tree_data is not None:
+            logger.info(f"Downloaded {len(tree_data)} tree records")
+
+        temp_data = _safe_result(temp_future, logger, "Error downloading temperature data")
+        if temp_data is not None:
+            logger.info(f"Downloaded temperature data: {len(temp_data)} records")
+
+        ndvi_data = _safe_result(
+            ndvi_future, logger, "NDVI data not available", level=logging.WARNING
+        )
         if ndvi_data is not None:
             logger.info(f"Downloaded NDVI data: {len(ndvi_data)} records")
-    except Exception as e:
-        logger.warning(f"NDVI data not available: {e}")
-        ndvi_data = None
     
     # Aggregate spatial data
     logger.info("Aggregating spatial data per H3 hexagon...")
@@ -178,25 +193,27 @@ Examples:
     if tree_data is not None:
         tree_stats = aggregator.aggregate_trees_per_hex(h3_grid, tree_data)
         tree_stats_file = cache_dir / "tree_stats.parquet"
-        tree_stats.to_parquet(tree_stats_file, compression="snappy")
+        tree_stats.to_parquet(tree_stats_file, compression="zstd",
+                              compression_level=3, use_dictionary=["h3_id"])
         logger.info(f"Cached tree statistics to {tree_stats_file}")
     
     green_stats = pd.DataFrame()
     if ndvi_data is not None:
         green_stats = aggregator.aggregate_green_space_per_hex(h3_grid, ndvi_data)
         green_stats_file = cache_dir / "green_stats.parquet"
-        green_stats.to_parquet(green_stats_file, compression="snappy")
+        green_stats.to_parquet(green_stats_file, compression="zstd",
+                               compression_level=3, use_dictionary=["h3_id"])
         logger.info(f"Cached green space statistics to {green_stats_file}")
     
     temp_stats = pd.DataFrame()
     if temp_data is not None:
         temp_stats = aggregator.aggregate_temperature_per_hex(h3_grid, temp_data)
         temp_stats_file = cache_dir / "temp_stats.parquet"
-        temp_stats.to_parquet(temp_stats_file, compression="snappy")
+        temp_stats.to_parquet(temp_stats_file, compression="zstd",
+                              compression_level=3, use_dictionary=["h3_id"])
         logger.info(f"Cached temperature statistics to {temp_stats_file}")
     
     # Create feature DataFrame
-    import pandas as pd
     features = aggregator.create_feature_dataframe(
         h3_grid,
         tree_stats,
@@ -205,7 +222,8 @@ Examples:
     )
     
     features_file = output_dir / "features.parquet"
-    features.to_parquet(features_file, compression="snappy")
+    features.to_parquet(features_file, compression="zstd",
+                        compression_level=3, use_dictionary=["h3_id"])
     logger.info(f"Saved feature DataFrame to {features_file}")
     
     if args.process_data:
@@ -229,23 +247,18 @@ Examples:
         logger.error("Must specify either --h3_id or --all")
         sys.exit(1)
     
-    # Run predictions
-    all_predictions = []
-    for hex_id in hex_ids:
-        logger.info(f"Predicting for H3 hex: {hex_id}")
-        predictions = predictor.predict_for_h3_hex(
-            hex_id=hex_id,
-            forecast_years=args.years,
-            initial_date=None  # Use current date
-        )
-        predictions["h3_id"] = hex_id
-        all_predictions.append(predictions)
-    
-    # Combine predictions
-    if all_predictions:
-        combined_predictions = pd.concat(all_predictions, ignore_index=True)
+    # Run predictions in one batched call (amortizes model setup across hexes)
+    logger.info(f"Predicting for {len(hex_ids)} H3 hexes")
+    combined_predictions = predictor.predict_for_h3_hexes(
+        hex_ids=hex_ids,
+        forecast_years=args.years,
+        initial_date=None  # Use current date
+    )
+
+    if not combined_predictions.empty:
         predictions_file = output_dir / "predictions.parquet"
-        combined_predictions.to_parquet(predictions_file, compression="snappy")
+        combined_predictions.to_parquet(predictions_file, compression="zstd",
+                                        compression_level=3, use_dictionary=["h3_id"])
         logger.info(f"Saved predictions to {predictions_file}")
         
         # Generate visualization if requested
@@ -7,14 +7,96 @@ to achieve target temperature reductions per H3 cell.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from pathlib import Path
 import h3
 
+try:
+    # Optional: parallel kernel for whole-grid trees-needed calculations
+    from numba import njit, prange
+except ImportError:
+    njit = prange = None
+
 logger = logging.getLogger(__name__)
 
 
+if njit is not None:
+
+    @njit(cache=True)
+    def _reduction_scalar(count, area, min_d, sat_d, per_tree, max_red):
+        if area <= 0.0:
+            return 0.0
+        density = count / area
+        if density < min_d:
+            reduction = 0.0
+        elif density < sat_d:
+            reduction = (density - min_d) * per_tree
+        else:
+            saturation = (sat_d - min_d) * per_tree
+            reduction = saturation + saturation * np.log1p((density - sat_d) / sat_d) * 0.1
+        return min(reduction, max_red)
+
+    @njit(parallel=True, cache=True)
+    def _trees_needed_kernel(counts, areas, target, min_d, sat_d, per_tree, max_red):
+        n = counts.shape[0]
+        trees_needed = np.zeros(n, dtype=np.float64)
+        current_red = np.zeros(n, dtype=np.float64)
+        predicted_red = np.zeros(n, dtype=np.float64)
+        saturation = (sat_d - min_d) * per_tree
+        for i in prange(n):
+            area = areas[i]
+            count = counts[i]
+            current = _reduction_scalar(count, area, min_d, sat_d, per_tree, max_red)
+            current_red[i] = current
+            predicted_red[i] = current
+            if area <= 0.0:
+                continue
+            if target > max_red:
+                trees_needed[i] = np.inf
+                continue
+            required = target - current
+            if required <= 0.0:
+                continue
+            if required <= saturation:
+                required_density = required / per_tree + min_d
+            else:
+                required_density = sat_d * np.exp((required - saturation) / (saturation * 0.1))
+            needed = np.ceil(required_density * area) - count
+            if needed < 0.0:
+                needed = 0.0
+            trees_needed[i] = needed
+            predicted_red[i] = _reduction_scalar(
+                count + needed, area, min_d, sat_d, per_tree, max_red
+            )
+        return trees_needed, current_red, predicted_red
+
+
+def _make_reducer(min_d, sat_d, per_tree, max_red):
+    """
+    Factory: scalar reduction model with the config constants baked in.
+
+    The returned closure reads the parameters as captured locals instead of
+    doing four attribute lookups per call, which matters when the scalar
+    model runs inside per-hex loops.
+    """
+    saturation = (sat_d - min_d) * per_tree
+
+    def reduce(count, area):
+        if area <= 0.0:
+            return 0.0
+        density = count / area
+        if density < min_d:
+            reduction = 0.0
+        elif density < sat_d:
+            reduction = (density - min_d) * per_tree
+        else:
+            reduction = saturation + saturation * np.log1p((density - sat_d) / sat_d) * 0.1
+        return min(reduction, max_red)
+
+    return reduce
+
+
 class TreeMitigationModel:
     """
     Model to predict tree requirements for temperature reduction.
@@ -56,7 +138,98 @@ class TreeMitigationModel:
         self.saturation_density = config.get("mitigation", {}).get(
             "saturation_tree_density_km2", 500.0
         )
-    
+
+        # Scalar reduction model specialized for this config (constants are
+        # locals of the closure rather than per-call attribute lookups)
+        self._reduce = _make_reducer(
+            self.min_tree_density, self.saturation_density,
+            self.temp_reduction_per_tree, self.max_temp_reduction
+        )
+
+        # Hash indexes over the caller-supplied DataFrames, built lazily and
+        # keyed by the source frame's id() so repeated per-hex calls against
+        # the same frame reuse them instead of re-scanning it each time
+        self._pred_index = None
+        self._pred_index_src = None
+        self._tree_counts = None
+        self._tree_counts_src = None
+
+    def _hex_predictions(
+        self,
+        earth2_predictions: pd.DataFrame,
+        hex_id: str
+    ) -> pd.DataFrame:
+        """Get all prediction rows for a hex via the cached group index."""
+        if self._pred_index_src != id(earth2_predictions):
+            # groupby builds its hash index lazily without copying or sorting
+            # the frame, unlike the set_index + sort_index it replaces
+            self._pred_index = earth2_predictions.groupby("h3_id", sort=False)
+            self._pred_index_src = id(earth2_predictions)
+
+        try:
+            return self._pred_index.get_group(hex_id)
+        except KeyError:
+            return earth2_predictions.iloc[0:0]
+
+    def _tree_count(
+        self,
+        tree_stats: Optional[pd.DataFrame],
+        hex_id: str
+    ) -> int:
+        """Get the tree count for a hex via an indexed O(1) lookup."""
+        if tree_stats is None:
+            return 0
+
+        if self._tree_counts_src != id(tree_stats):
+            self._tree_counts = tree_stats.set_index("h3_id")["tree_count"].to_dict()
+            self._tree_counts_src = id(tree_stats)
+
+        return int(self._tree_counts.get(hex_id, 0))
+
+    def predict_temperature_reduction_vec(
+        self,
+        tree_counts: np.ndarray,
+        hex_areas_km2: np.ndarray
+    ) -> np.ndarray:
+        """
+        Predict temperature reduction from existing trees over arrays of hexes.
+
+        Vectorized form of the diminishing-returns model: the branch logic
+        runs as np.select over the whole array instead of per-hex Python.
+
+        Args:
+            tree_counts: Number of trees per hex
+            hex_areas_km2: Area of each hexagon in km²
+
+        Returns:
+            Array of temperature reductions in °C
+        """
+        counts = np.asarray(tree_counts, dtype=np.float64)
+        areas = np.asarray(hex_areas_km2, dtype=np.float64)
+
+        # Zero-area hexes get infinite "area" so density (and reduction) is 0
+        density = counts / np.where(areas > 0, areas, np.inf)
+
+        # Apply diminishing returns model
+        # Linear up to saturation, then logarithmic
+        linear = (density - self.min_tree_density) * self.temp_reduction_per_tree
+        saturation_reduction = (
+            self.saturation_density - self.min_tree_density
+        ) * self.temp_reduction_per_tree
+        excess = np.maximum(density - self.saturation_density, 0.0)
+        logarithmic = saturation_reduction + (
+            saturation_reduction * np.log1p(excess / self.saturation_density) * 0.1
+        )
+
+        reduction = np.select(
+            [density < self.min_tree_density, density < self.saturation_density],
+            [0.0, linear],
+            default=logarithmic
+        )
+
+        # Cap at maximum reduction
+        return np.minimum(reduction, self.max_temp_reduction)
+
     def predict_temperature_reduction(
         self,
         current_tree_count: int,
@@ -65,39 +238,16 @@ class TreeMitigationModel:
     ) -> float:
         """
         Predict current temperature reduction from existing trees.
-        
+
         Args:
             current_tree_count: Current number of trees in hex
             hex_area_km2: Area of hexagon in km²
             current_temp: Current baseline temperature (°C)
-            
+
         Returns:
             Temperature reduction in °C
         """
-        if hex_area_km2 == 0:
-            return 0.0
-        
-        tree_density = current_tree_count / hex_area_km2
-        
-        # Apply diminishing returns model
-        # Linear up to saturation, then logarithmic
-        if tree_density < self.min_tree_density:
-            reduction = 0.0
-        elif tree_density < self.saturation_density:
-            # Linear relationship
-            effective_density = tree_density - self.min_tree_density
-            reduction = effective_density * self.temp_reduction_per_tree
-        else:
-            # Logarithmic relationship after saturation
-            saturation_reduction = (self.saturation_density - self.min_tree_density) * self.temp_reduction_per_tree
-            excess_density = tree_density - self.saturation_density
-            additional_reduction = saturation_reduction * np.log1p(excess_density / self.saturation_density) * 0.1
-            reduction = saturation_reduction + additional_reduction
-        
-        # Cap at maximum reduction
-        reduction = min(reduction, self.max_temp_reduction)
-        
-        return reduction
+        return float(self._reduce(current_tree_count, hex_area_km2))
     
     def calculate_trees_needed(
         self,
@@ -203,6 +353,74 @@ class TreeMitigationModel:
             "message": f"Need {trees_needed} additional trees to achieve {target_reduction:.2f}°C reduction"
         }
     
+    def calculate_trees_needed_bulk(
+        self,
+        df: pd.DataFrame,
+        target_reduction: float,
+        count_col: str = "tree_count",
+        area_col: str = "hex_area_km2"
+    ) -> pd.DataFrame:
+        """
+        Calculate trees needed for a whole grid of hexes in one pass.
+
+        Uses a numba-compiled parallel kernel when numba is installed and a
+        vectorized NumPy path otherwise; both replicate the per-hex logic of
+        calculate_trees_needed.
+
+        Args:
+            df: DataFrame with tree counts and hex areas
+            target_reduction: Desired temperature reduction in °C
+            count_col: Column holding current tree counts
+            area_col: Column holding hex areas in km²
+
+        Returns:
+            DataFrame (aligned to df's index) with trees_needed,
+            current_reduction, predicted_reduction and feasible columns
+        """
+        counts = df[count_col].to_numpy(dtype=np.float64)
+        areas = df[area_col].to_numpy(dtype=np.float64)
+        target = float(target_reduction)
+
+        if njit is not None:
+            trees, current, predicted = _trees_needed_kernel(
+                counts, areas, target,
+                self.min_tree_density, self.saturation_density,
+                self.temp_reduction_per_tree, self.max_temp_reduction
+            )
+        else:
+            current = self.predict_temperature_reduction_vec(counts, areas)
+            predicted = current.copy()
+            if target > self.max_temp_reduction:
+                trees = np.where(areas > 0, np.inf, 0.0)
+            else:
+                saturation = (
+                    self.saturation_density - self.min_tree_density
+                ) * self.temp_reduction_per_tree
+                required = target - current
+                with np.errstate(over="ignore"):
+                    required_density = np.where(
+                        required <= saturation,
+                        required / self.temp_reduction_per_tree + self.min_tree_density,
+                        self.saturation_density
+                        * np.exp(np.maximum(required - saturation, 0.0) / (saturation * 0.1))
+                    )
+                trees = np.maximum(np.ceil(required_density * areas) - counts, 0.0)
+                trees[(areas <= 0) | (required <= 0)] = 0.0
+                needs_more = trees > 0
+                predicted[needs_more] = self.predict_temperature_reduction_vec(
+                    counts[needs_more] + trees[needs_more], areas[needs_more]
+                )
+
+        return pd.DataFrame(
+            {
+                "trees_needed": trees,
+                "current_reduction": current,
+                "predicted_reduction": predicted,
+                "feasible": (areas > 0) & (target <= self.max_temp_reduction),
+            },
+            index=df.index
+        )
+
     def predict_temperature_with_trees(
         self,
         hex_id: str,
@@ -234,23 +452,22 @@ class TreeMitigationModel:
         hex_area_km2 = h3.cell_area(hex_id, unit="km^2")
         
         # Get baseline temperature from Earth-2
-        hex_predictions = earth2_predictions[earth2_predictions["h3_id"] == hex_id]
-        
+        hex_predictions = self._hex_predictions(earth2_predictions, hex_id)
+
         if hex_predictions.empty:
             return {
                 "hex_id": hex_id,
                 "error": "No Earth-2 predictions found for this hex",
                 "success": False
             }
-        
-        baseline_temp = hex_predictions["temperature_c"].mean()
-        
+
+        # All four stats in one pass over the column; mean doubles as the
+        # baseline temperature and feeds temperature_range below
+        temp_stats = hex_predictions["temperature_c"].agg(["mean", "min", "max", "std"])
+        baseline_temp = temp_stats["mean"]
+
         # Get current tree count
-        current_tree_count = 0
-        if tree_stats is not None:
-            hex_tree_data = tree_stats[tree_stats["h3_id"] == hex_id]
-            if not hex_tree_data.empty:
-                current_tree_count = int(hex_tree_data["tree_count"].iloc[0])
+        current_tree_count = self._tree_count(tree_stats, hex_id)
         
         # Calculate current reduction
         current_reduction = self.predict_temperature_reduction(
@@ -288,10 +505,10 @@ class TreeMitigationModel:
             "success": True,
             "earth2_forecast_horizons": sorted(hex_predictions["forecast_horizon_years"].unique().tolist()),
             "temperature_range": {
-                "min": float(hex_predictions["temperature_c"].min()),
-                "max": float(hex_predictions["temperature_c"].max()),
-                "mean": float(hex_predictions["temperature_c"].mean()),
-                "std": float(hex_predictions["temperature_c"].std())
+                "min": float(temp_stats["min"]),
+                "max": float(temp_stats["max"]),
+                "mean": float(temp_stats["mean"]),
+                "std": float(temp_stats["std"])
             }
         }
         
@@ -321,24 +538,22 @@ class TreeMitigationModel:
         hex_area_km2 = h3.cell_area(hex_id, unit="km^2")
         
         # Get current/future temperature from Earth-2 predictions
-        hex_predictions = earth2_predictions[earth2_predictions["h3_id"] == hex_id]
-        
+        hex_predictions = self._hex_predictions(earth2_predictions, hex_id)
+
         if hex_predictions.empty:
             return {
                 "hex_id": hex_id,
                 "error": "No Earth-2 predictions found for this hex",
                 "feasible": False
             }
-        
-        # Use average temperature across all forecast horizons
-        current_temp = hex_predictions["temperature_c"].mean()
-        
+
+        # Use average temperature across all forecast horizons; one agg pass
+        # also yields the min/max/std reported in temperature_range
+        temp_stats = hex_predictions["temperature_c"].agg(["mean", "min", "max", "std"])
+        current_temp = temp_stats["mean"]
+
         # Get current tree count
-        current_tree_count = 0
-        if tree_stats is not None:
-            hex_tree_data = tree_stats[tree_stats["h3_id"] == hex_id]
-            if not hex_tree_data.empty:
-                current_tree_count = int(hex_tree_data["tree_count"].iloc[0])
+        current_tree_count = self._tree_count(tree_stats, hex_id)
         
         # Calculate trees needed
         mitigation_result = self.calculate_trees_needed(
@@ -360,11 +575,81 @@ class TreeMitigationModel:
             **mitigation_result,
             "earth2_forecast_horizons": sorted(hex_predictions["forecast_horizon_years"].unique().tolist()),
             "temperature_range": {
-                "min": float(hex_predictions["temperature_c"].min()),
-                "max": float(hex_predictions["temperature_c"].max()),
-                "mean": float(hex_predictions["temperature_c"].mean()),
-                "std": float(hex_predictions["temperature_c"].std())
+                "min": float(temp_stats["min"]),
+                "max": float(temp_stats["max"]),
+                "mean": float(temp_stats["mean"]),
+                "std": float(temp_stats["std"])
             }
         }
-        
+
         return result
+
+    def analyze_hexes(
+        self,
+        hex_ids: List[str],
+        target_reduction: float,
+        earth2_predictions: pd.DataFrame,
+        tree_stats: Optional[pd.DataFrame] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze many H3 hexes in one pass.
+
+        Temperature statistics are computed with a single groupby over the
+        Earth-2 predictions instead of re-filtering the frame for every hex.
+
+        Args:
+            hex_ids: H3 hexagon IDs to analyze
+            target_reduction: Target temperature reduction in °C
+            earth2_predictions: DataFrame with Earth-2 temperature predictions
+            tree_stats: Optional DataFrame with tree statistics per hex
+
+        Returns:
+            List of analysis result dictionaries (same shape as
+            analyze_hex_with_earth2)
+        """
+        pred_groups = earth2_predictions.groupby("h3_id")
+        temp_stats = pred_groups["temperature_c"].agg(["mean", "min", "max", "std"])
+        horizons = pred_groups["forecast_horizon_years"].unique()
+
+        results = []
+        for hex_id in hex_ids:
+            if hex_id not in temp_stats.index:
+                results.append({
+                    "hex_id": hex_id,
+                    "error": "No Earth-2 predictions found for this hex",
+                    "feasible": False
+                })
+                continue
+
+            lat, lon = h3.cell_to_latlng(hex_id)
+            hex_area_km2 = h3.cell_area(hex_id, unit="km^2")
+            stats = temp_stats.loc[hex_id]
+            current_temp = float(stats["mean"])
+            current_tree_count = self._tree_count(tree_stats, hex_id)
+
+            mitigation_result = self.calculate_trees_needed(
+                target_reduction=target_reduction,
+                current_tree_count=current_tree_count,
+                hex_area_km2=hex_area_km2,
+                current_temp=current_temp
+            )
+
+            results.append({
+                "hex_id": hex_id,
+                "lat": lat,
+                "lon": lon,
+                "hex_area_km2": hex_area_km2,
+                "current_temperature_c": current_temp,
+                "current_tree_count": current_tree_count,
+                "target_reduction_c": target_reduction,
+                **mitigation_result,
+                "earth2_forecast_horizons": sorted(horizons.loc[hex_id].tolist()),
+                "temperature_range": {
+                    "min": float(stats["min"]),
+                    "max": float(stats["max"]),
+                    "mean": float(stats["mean"]),
+                    "std": float(stats["std"])
+                }
+            })
+
+        return results
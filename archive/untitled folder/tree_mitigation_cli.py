@@ -7,7 +7,9 @@ for H3 hexagons using Earth-2 predictions.
 """
 
 import argparse
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
 import logging
@@ -22,6 +24,22 @@ from models import TreeMitigationModel
 from utils.config_loader import get_cache_dir, get_output_dir, get_raw_data_dir
 
 
+def _predict_one(hex_id, config, forecast_years, cache_dir):
+    """
+    Worker: predict one hex in its own process.
+
+    Each task builds its own predictor (model handles don't pickle), seeded
+    from the hex ID so parallel hexes don't replay one noise stream.
+    """
+    config.setdefault("earth2", {})
+    base_seed = config["earth2"].get("seed", 0)
+    config["earth2"]["seed"] = (base_seed + int(hex_id, 16)) % 2**32
+    predictor = Earth2Predictor(config)
+    return predictor.predict_for_h3_hex_cached(
+        hex_id, forecast_years, initial_date=None, cache_dir=cache_dir
+    )
+
+
 def main():
     """Main CLI function for tree mitigation analysis."""
     parser = argparse.ArgumentParser(
@@ -126,22 +144,31 @@ Examples:
     
     if args.use_cached_predictions and predictions_file.exists():
         logger.info(f"Loading cached predictions from {predictions_file}")
-        earth2_predictions = pd.read_parquet(predictions_file)
+        # Only the rows and columns the analysis touches: row groups outside
+        # the requested hexes are pruned via parquet statistics
+        earth2_predictions = pd.read_parquet(
+            predictions_file,
+            engine="pyarrow",
+            columns=["h3_id", "temperature_c", "forecast_horizon_years"],
+            filters=[("h3_id", "in", hex_ids)]
+        )
     else:
         logger.info("Generating Earth-2 predictions...")
-        predictor = Earth2Predictor(config)
-        
-        all_predictions = []
-        for hex_id in hex_ids:
-            logger.info(f"Predicting for hex: {hex_id}")
-            predictions = predictor.predict_for_h3_hex(
-                hex_id=hex_id,
-                forecast_years=[1, 5, 10],
-                initial_date=None
-            )
-            predictions["h3_id"] = hex_id
-            all_predictions.append(predictions)
-        
+
+        # One process per hex: the model calls are independent, so they
+        # overlap across cores instead of running back to back
+        n_workers = min(len(hex_ids), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [
+                (hex_id, executor.submit(_predict_one, hex_id, config,
+                                         [1, 5, 10], cache_dir))
+                for hex_id in hex_ids
+            ]
+            all_predictions = []
+            for hex_id, future in futures:
+                logger.info(f"Predicting for hex: {hex_id}")
+                all_predictions.append(future.result())
+
         earth2_predictions = pd.concat(all_predictions, ignore_index=True)
         logger.info(f"Generated {len(earth2_predictions)} predictions")
     
@@ -175,20 +202,19 @@ Examples:
     # Initialize mitigation model
     mitigation_model = TreeMitigationModel(config)
     
-    # Analyze each hex
-    results = []
-    for hex_id in hex_ids:
-        logger.info(f"Analyzing hex {hex_id} for {args.target_reduction}°C reduction...")
-        
-        result = mitigation_model.analyze_hex_with_earth2(
-            hex_id=hex_id,
-            target_reduction=args.target_reduction,
-            earth2_predictions=earth2_predictions,
-            tree_stats=tree_stats
-        )
-        
-        results.append(result)
-        
+    # Analyze all hexes in one pass (one groupby over the predictions
+    # instead of re-filtering the frame per hex)
+    logger.info(f"Analyzing {len(hex_ids)} hexes for "
+                f"{args.target_reduction}°C reduction...")
+    results = mitigation_model.analyze_hexes(
+        hex_ids=hex_ids,
+        target_reduction=args.target_reduction,
+        earth2_predictions=earth2_predictions,
+        tree_stats=tree_stats
+    )
+
+    for result in results:
+        hex_id = result["hex_id"]
         # Print summary
         print(f"\n{'='*60}")
         print(f"Analysis for H3 Hex: {hex_id}")
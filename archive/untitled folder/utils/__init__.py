@@ -2,13 +2,14 @@
 
 from .config_loader import load_config
 from .logger import setup_logger
-from .h3_utils import create_h3_grid, hex_to_geojson, validate_h3_id
+from .h3_utils import create_h3_grid, get_or_build_h3_grid, hex_to_geojson, validate_h3_id
 from .visualization import create_h3_choropleth, visualize_predictions
 
 __all__ = [
     "load_config",
     "setup_logger",
     "create_h3_grid",
+    "get_or_build_h3_grid",
     "hex_to_geojson",
     "validate_h3_id",
     "create_h3_choropleth",
@@ -1,6 +1,8 @@
 """Configuration loader for NYC UHI prediction system."""
 
+import copy
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any
 import logging
@@ -8,44 +10,58 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _parse_config(resolved_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a config file once per (path, mtime) — mtime_ns keys the cache."""
+    with open(resolved_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    logger.info(f"Loaded configuration from {resolved_path}")
+    return config
+
+
 def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     """
     Load configuration from YAML file.
-    
+
+    Repeat loads of an unchanged file are served from an in-process cache
+    instead of re-parsing the YAML; editing the file invalidates the cache
+    via its mtime. Each call returns a deep copy, so callers may mutate
+    their config freely.
+
     Args:
         config_path: Path to config.yaml file
-        
+
     Returns:
         Dictionary containing configuration
     """
     config_file = Path(config_path)
-    
+
     if not config_file.exists():
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
-    
-    with open(config_file, "r") as f:
-        config = yaml.safe_load(f)
-    
-    logger.info(f"Loaded configuration from {config_path}")
-    return config
+
+    config = _parse_config(str(config_file.resolve()), config_file.stat().st_mtime_ns)
+    return copy.deepcopy(config)
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str) -> Path:
+    """Create a directory once per process instead of on every lookup."""
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
 
 
 def get_cache_dir(config: Dict[str, Any]) -> Path:
     """Get cache directory path from config."""
-    cache_dir = Path(config["processing"]["cache_dir"])
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir
+    return _ensure_dir(config["processing"]["cache_dir"])
 
 
 def get_output_dir(config: Dict[str, Any]) -> Path:
     """Get output directory path from config."""
-    output_dir = Path(config["processing"]["output_dir"])
-    output_dir.mkdir(parents=True, exist_ok=True)
-    return output_dir
+    return _ensure_dir(config["processing"]["output_dir"])
 
 
 def get_raw_data_dir(config: Dict[str, Any]) -> Path:
     """Get raw data directory path from config."""
-    raw_dir = Path(config["processing"]["raw_data_dir"])
-    raw_dir.mkdir(parents=True, exist_ok=True)
-    return raw_dir
+    return _ensure_dir(config["processing"]["raw_data_dir"])
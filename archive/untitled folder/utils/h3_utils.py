@@ -3,9 +3,11 @@
 import h3
 import geopandas as gpd
 import pandas as pd
+import shapely
 from typing import List, Tuple, Dict, Optional
 from shapely.geometry import Polygon, Point
 import numpy as np
+from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,40 +36,109 @@ def create_h3_grid(
     logger.info(f"Creating H3 grid at resolution {resolution} for bbox: "
                 f"({min_lat}, {min_lon}) to ({max_lat}, {max_lon})")
     
-    # Get all hexes covering the bounding box
-    hex_ids = set()
-    
-    # Sample points across the bounding box
-    lat_step = (max_lat - min_lat) / 100
-    lon_step = (max_lon - min_lon) / 100
-    
-    for lat in np.arange(min_lat, max_lat + lat_step, lat_step):
-        for lon in np.arange(min_lon, max_lon + lon_step, lon_step):
-            hex_id = h3.latlng_to_cell(lat, lon, resolution)
-            hex_ids.add(hex_id)
-    
-    # Convert hex IDs to GeoDataFrame
-    hex_data = []
-    for hex_id in hex_ids:
-        # Get hex boundary (returns list of (lat, lon) tuples)
-        hex_boundary = h3.cell_to_boundary(hex_id)
-        
-        # Create polygon (convert to (lon, lat) for shapely)
-        coords = [(lon, lat) for lat, lon in hex_boundary]
-        polygon = Polygon(coords)
-        
-        hex_data.append({
-            "h3_id": hex_id,
-            "geometry": polygon,
-            "resolution": resolution
-        })
-    
-    gdf = gpd.GeoDataFrame(hex_data, crs="EPSG:4326")
-    
+    # Polyfill the bbox directly instead of sampling 101x101 probe points:
+    # one libh3 call returns every cell overlapping the box, exactly and
+    # independently of any sampling density
+    bbox_poly = h3.LatLngPoly([
+        (min_lat, min_lon),
+        (max_lat, min_lon),
+        (max_lat, max_lon),
+        (min_lat, max_lon)
+    ])
+    hex_ids = h3.polygon_to_cells_experimental(
+        bbox_poly, resolution, contain="overlap"
+    )
+
+    gdf = _cells_to_gdf(sorted(hex_ids), resolution)
+
     logger.info(f"Created {len(gdf)} H3 hexagons")
     return gdf
 
 
+def _cells_to_gdf(hex_ids: List[str], resolution: int) -> gpd.GeoDataFrame:
+    """Build the grid GeoDataFrame for a list of cell IDs."""
+    boundaries = [h3.cell_to_boundary(hex_id) for hex_id in hex_ids]
+
+    # Hex cells all have 6 vertices, so their (lon, lat) rings stack into one
+    # (N, 6, 2) array and shapely builds every polygon in a single C call;
+    # pentagon cells (never in the NYC bbox, but possible) fall back per cell
+    if boundaries and all(len(boundary) == 6 for boundary in boundaries):
+        coords = np.asarray(boundaries)[:, :, ::-1]
+        geometry = shapely.polygons(coords)
+    else:
+        geometry = [
+            Polygon([(lon, lat) for lat, lon in boundary])
+            for boundary in boundaries
+        ]
+
+    return gpd.GeoDataFrame(
+        {
+            "h3_id": hex_ids,
+            "geometry": geometry,
+            "resolution": resolution
+        },
+        crs="EPSG:4326"
+    )
+
+
+def get_or_build_h3_grid(
+    min_lat: float,
+    max_lat: float,
+    min_lon: float,
+    max_lon: float,
+    resolution: int = 9,
+    cache_file: Optional[Path] = None,
+    force_rebuild: bool = False
+) -> gpd.GeoDataFrame:
+    """
+    Load a cached H3 grid if present, otherwise build and cache it.
+
+    Grid construction is expensive at high resolutions, so entrypoints
+    should share one cached parquet instead of rebuilding per invocation.
+
+    Args:
+        min_lat: Minimum latitude
+        max_lat: Maximum latitude
+        min_lon: Minimum longitude
+        max_lon: Maximum longitude
+        resolution: H3 resolution (8-10 recommended for NYC)
+        cache_file: Parquet file to load from / save to (None disables caching)
+        force_rebuild: Rebuild the grid even if a cache file exists
+
+    Returns:
+        GeoDataFrame with H3 hexagons as geometries
+    """
+    if cache_file is not None:
+        cache_file = Path(cache_file)
+        if cache_file.exists() and not force_rebuild:
+            gdf = gpd.read_parquet(cache_file)
+            grid_min_lon, grid_min_lat, grid_max_lon, grid_max_lat = gdf.total_bounds
+            same_resolution = (
+                "resolution" in gdf.columns and (gdf["resolution"] == resolution).all()
+            )
+            # Hexes overhang the bbox they were built from, so a matching
+            # cached grid always covers the requested bounds
+            covers_bbox = (
+                grid_min_lat <= min_lat and grid_max_lat >= max_lat
+                and grid_min_lon <= min_lon and grid_max_lon >= max_lon
+            )
+            if same_resolution and covers_bbox:
+                logger.info(f"Loaded cached H3 grid from {cache_file} "
+                            f"({len(gdf)} hexagons)")
+                return gdf
+            logger.info("Cached H3 grid does not match requested "
+                        "resolution/bounds; rebuilding")
+
+    gdf = create_h3_grid(min_lat, max_lat, min_lon, max_lon, resolution)
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        gdf.to_parquet(cache_file, compression="zstd")
+        logger.info(f"Cached H3 grid to {cache_file}")
+
+    return gdf
+
+
 def hex_to_geojson(hex_id: str) -> Dict:
     """
     Convert H3 hex ID to GeoJSON polygon.
@@ -42,30 +42,36 @@ def create_h3_choropleth(
         zoom_start=zoom_start,
         tiles="OpenStreetMap"
     )
-    
-    # Add H3 hexagons
-    for idx, row in gdf.iterrows():
-        if pd.isna(row[value_column]):
-            continue
-        
-        # Create popup text
-        popup_text = f"""
-        <b>H3 ID:</b> {row.get('h3_id', 'N/A')}<br>
-        <b>{value_column}:</b> {row[value_column]:.2f}
-        """
-        
-        # Add polygon to map
-        folium.GeoJson(
-            row.geometry.__geo_interface__,
-            style_function=lambda feature, val=row[value_column]: {
-                "fillColor": _get_color(val, gdf[value_column], color_scheme),
-                "color": "black",
-                "weight": 1,
-                "fillOpacity": 0.7
-            },
-            popup=folium.Popup(popup_text, max_width=200)
-        ).add_to(m)
-    
+
+    # One GeoJson layer for the whole grid instead of one layer per hex:
+    # folium serializes a single FeatureCollection and the browser renders
+    # one SVG layer, instead of thousands of layer objects in the HTML
+    plot_gdf = gdf[gdf[value_column].notna()]
+
+    # Color bounds computed once, not per hex inside the style callback
+    vmin = float(plot_gdf[value_column].min()) if len(plot_gdf) else 0.0
+    vmax = float(plot_gdf[value_column].max()) if len(plot_gdf) else 0.0
+
+    def style_function(feature):
+        return {
+            "fillColor": _get_color(
+                feature["properties"][value_column], vmin, vmax, color_scheme
+            ),
+            "color": "black",
+            "weight": 1,
+            "fillOpacity": 0.7
+        }
+
+    tooltip_fields = (
+        ["h3_id", value_column] if "h3_id" in plot_gdf.columns
+        else [value_column]
+    )
+    folium.GeoJson(
+        plot_gdf,
+        style_function=style_function,
+        tooltip=folium.GeoJsonTooltip(fields=tooltip_fields)
+    ).add_to(m)
+
     # Add colorbar legend (simplified)
     m.add_child(folium.map.LayerControl())
     
@@ -76,18 +82,15 @@ def create_h3_choropleth(
     return m
 
 
-def _get_color(value: float, series: pd.Series, scheme: str) -> str:
+def _get_color(value: float, min_val: float, max_val: float, scheme: str) -> str:
     """Get color for value based on color scheme."""
     # Simple color mapping (can be enhanced with ColorBrewer)
     if pd.isna(value):
         return "gray"
-    
-    min_val = series.min()
-    max_val = series.max()
-    
+
     if max_val == min_val:
         return "blue"
-    
+
     normalized = (value - min_val) / (max_val - min_val)
     
     # Simple YlOrRd scheme
@@ -144,15 +147,14 @@ def visualize_predictions(
             location=[40.7128, -73.9352],
             zoom_start=11
         )
-        for idx, row in gdf.iterrows():
-            folium.GeoJson(
-                row.geometry.__geo_interface__,
-                style_function=lambda feature: {
-                    "fillColor": "blue",
-                    "color": "black",
-                    "weight": 1,
-                    "fillOpacity": 0.3
-                }
-            ).add_to(m)
+        folium.GeoJson(
+            gdf,
+            style_function=lambda feature: {
+                "fillColor": "blue",
+                "color": "black",
+                "weight": 1,
+                "fillOpacity": 0.3
+            }
+        ).add_to(m)
         m.save(output_file)
         return m